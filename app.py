@@ -9,11 +9,20 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
-from database.neo4j_client import Neo4jClient
+from neo4j.exceptions import SessionExpired
+
+from config.settings import (
+    NEO4J_URI,
+    NEO4J_USERNAME,
+    NEO4J_PASSWORD,
+    NEO4J_DATABASE,
+)
+from database.neo4j_client import Neo4jClient, build_driver
 from query.global_query_v4 import global_query, format_global_results
 
 # Page configuration
@@ -51,13 +60,43 @@ st.markdown("""
 # Initialize session state
 if 'connected' not in st.session_state:
     st.session_state.connected = False
+HISTORY_COLUMNS = ['timestamp', 'query', 'cypher', 'results_count']
+
+def empty_history():
+    """Empty query-history frame (timestamps stored pre-formatted)"""
+    return pd.DataFrame(columns=HISTORY_COLUMNS)
+
 if 'query_history' not in st.session_state:
-    st.session_state.query_history = []
+    st.session_state.query_history = empty_history()
+
+def add_to_history(query, cypher, results_count):
+    """Append one row in place instead of rebuilding the frame every rerun"""
+    history = st.session_state.query_history
+    history.loc[len(history)] = [
+        datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        query,
+        cypher,
+        results_count,
+    ]
+
+@st.cache_resource(show_spinner=False)
+def get_driver(uri, username, password):
+    """App-wide Neo4j driver: one connection pool shared by all sessions and reruns"""
+    return build_driver(uri, username, password)
+
+def get_client(uri, username, password):
+    """Neo4j client bound to the shared driver"""
+    return Neo4jClient(
+        uri=uri,
+        username=username,
+        password=password,
+        driver=get_driver(uri, username, password),
+    )
 
 def connect_to_neo4j():
     """Connect to Neo4j database"""
     try:
-        client = Neo4jClient()
+        client = get_client(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
         if client.verify_connection():
             st.session_state.connected = True
             st.session_state.client = client
@@ -67,54 +106,90 @@ def connect_to_neo4j():
     except Exception as e:
         return False, f"❌ Connection error: {str(e)}"
 
-def get_graph_statistics():
-    """Get basic graph statistics"""
-    try:
-        with st.session_state.client.driver.session() as session:
-            # Entity statistics
-            entities = session.run("MATCH (e:Entity) RETURN count(e) as count").single()["count"]
-            
-            # Relationship statistics
-            relationships = session.run("MATCH ()-[r]->() RETURN count(r) as count").single()["count"]
-            
-            # Section statistics
-            sections = session.run("MATCH (s:Section) RETURN count(s) as count").single()["count"]
-            
-            # Community statistics
-            communities = session.run("MATCH (c:Community) RETURN count(c) as count").single()["count"]
-            
-            # Salience distribution
-            salience_query = """
-            MATCH (e:Entity) 
-            WHERE e.salience IS NOT NULL
-            RETURN e.salience as salience, count(e) as count
-            ORDER BY count DESC
-            """
-            salience_data = list(session.run(salience_query))
-            
-            return {
-                'entities': entities,
-                'relationships': relationships,
-                'sections': sections,
-                'communities': communities,
-                'salience_distribution': salience_data
-            }
-    except Exception as e:
-        st.error(f"Error getting statistics: {str(e)}")
-        return None
+def _run_read(driver, cypher, params=None):
+    """Run a read query in its own session (safe to call from worker threads)"""
+    with driver.session(database=NEO4J_DATABASE) as session:
+        return [record.data() for record in session.run(cypher, params or {})]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_graph_statistics(uri):
+    """Get basic graph statistics (cached per connection URI; errors raise
+    so a failure is not cached as an empty result)"""
+    client = get_client(uri, NEO4J_USERNAME, NEO4J_PASSWORD)
+
+    # Entity / relationship / section / community counts (one round-trip,
+    # each a count-store lookup rather than a scan)
+    counts_query = """
+    CALL { MATCH (e:Entity) RETURN count(*) AS entities }
+    CALL { MATCH ()-[]->() RETURN count(*) AS relationships }
+    CALL { MATCH (s:Section) RETURN count(*) AS sections }
+    CALL { MATCH (c:Community) RETURN count(*) AS communities }
+    RETURN entities, relationships, sections, communities
+    """
+
+    # Salience distribution
+    salience_query = """
+    MATCH (e:Entity) 
+    WHERE e.salience IS NOT NULL
+    RETURN e.salience as salience, count(e) as count
+    ORDER BY count DESC
+    """
+
+    # Independent queries run concurrently: latency is max(RTT), not sum
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        counts_future = pool.submit(_run_read, client.driver, counts_query)
+        salience_future = pool.submit(_run_read, client.driver, salience_query)
+        counts = counts_future.result()[0]
+        salience_data = salience_future.result()
+
+    return {
+        'entities': counts['entities'],
+        'relationships': counts['relationships'],
+        'sections': counts['sections'],
+        'communities': counts['communities'],
+        'salience_distribution': salience_data
+    }
+
+def get_bolt_session():
+    """Bolt session reused across query executions in this browser session"""
+    if 'bolt_session' not in st.session_state:
+        st.session_state.bolt_session = st.session_state.client.driver.session(
+            database=NEO4J_DATABASE
+        )
+    return st.session_state.bolt_session
 
-def execute_query(query_text, query_type="custom"):
-    """Execute a query against the graph"""
+def close_bolt_session():
+    """Close and forget the cached Bolt session"""
+    session = st.session_state.pop('bolt_session', None)
+    if session is not None:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+def execute_query(query_text, query_type="custom", params=None, read_only=False):
+    """Execute a query against the graph (read_only: safe to re-run)"""
     try:
-        with st.session_state.client.driver.session() as session:
-            if query_type == "custom":
-                result = session.run(query_text)
-                records = [dict(record) for record in result]
-                return records, None
-            else:
-                # Use predefined query types
-                results, context = global_query(query_text, st.session_state.client)
-                return results, context
+        if query_type == "custom":
+            # Build the DataFrame straight from the Bolt result (no list[dict] copy)
+            try:
+                df = get_bolt_session().run(query_text, params or {}).to_df()
+            except SessionExpired:
+                # Stale connection: rebuild the session either way
+                close_bolt_session()
+                if not read_only:
+                    # Auto-commit: a CREATE / MERGE / SET may already have
+                    # been applied, so never re-run user Cypher blindly
+                    return None, (
+                        "Connection was reset mid-query; it may already have run. "
+                        "Check the graph, then re-submit."
+                    )
+                df = get_bolt_session().run(query_text, params or {}).to_df()
+            return df, None
+        else:
+            # Use predefined query types
+            results, context = global_query(query_text, st.session_state.client)
+            return results, context
     except Exception as e:
         return None, f"Query error: {str(e)}"
 
@@ -140,7 +215,11 @@ def main():
             st.success("✅ Connected to Neo4j")
             
             # Get and display statistics
-            stats = get_graph_statistics()
+            try:
+                stats = get_graph_statistics(st.session_state.client.uri)
+            except Exception as e:
+                st.error(f"Error getting statistics: {str(e)}")
+                stats = None
             if stats:
                 st.metric("📝 Entities", stats['entities'])
                 st.metric("🔗 Relationships", stats['relationships'])
@@ -154,12 +233,15 @@ def main():
                     st.plotly_chart(fig, use_container_width=True)
             
             if st.button("🔄 Refresh Statistics"):
+                get_graph_statistics.clear()
                 st.rerun()
             
             if st.button("🔌 Disconnect"):
                 st.session_state.connected = False
-                if 'client' in st.session_state:
-                    st.session_state.client.close()
+                # Shared driver stays pooled so reconnecting is instant
+                close_bolt_session()
+                st.session_state.pop('client', None)
+                get_graph_statistics.clear()
                 st.rerun()
     
     # Main content area
@@ -177,62 +259,58 @@ def main():
     with tab1:
         st.subheader("Pre-defined Graph Queries")
         
-        # Predefined queries
+        # Predefined queries: (cypher, params) — literals passed as parameters
         predefined_queries = {
-            "Show all CORE entities": """
+            "Show all CORE entities": ("""
                 MATCH (e:Entity) 
-                WHERE e.salience = 'CORE'
+                WHERE e.salience = $salience
                 RETURN e.name as entity, e.type as type, e.description as description
-                LIMIT 20
-            """,
-            "Show relationships between important entities": """
+                LIMIT $limit
+            """, {"salience": "CORE", "limit": 20}),
+            "Show relationships between important entities": ("""
                 MATCH (e1:Entity)-[r]->(e2:Entity)
-                WHERE e1.salience IN ['CORE', 'IMPORTANT'] AND e2.salience IN ['CORE', 'IMPORTANT']
+                WHERE e1.salience IN $saliences AND e2.salience IN $saliences
                 RETURN e1.name as source, type(r) as relationship, e2.name as target
-                LIMIT 15
-            """,
-            "Show community structure": """
+                LIMIT $limit
+            """, {"saliences": ["CORE", "IMPORTANT"], "limit": 15}),
+            "Show community structure": ("""
                 MATCH (e:Entity)
                 WHERE e.community_id IS NOT NULL
                 RETURN e.community_id as community, collect(e.name) as members
                 ORDER BY community
-            """,
-            "Show sections and their entities": """
+            """, {}),
+            "Show sections and their entities": ("""
                 MATCH (s:Section)-[:MENTIONS]->(e:Entity)
                 RETURN s.title as section, collect(e.name) as entities
                 ORDER BY s.section_id
-            """,
-            "Most connected entities": """
+            """, {}),
+            "Most connected entities": ("""
                 MATCH (e:Entity)-[r]-()
                 RETURN e.name as entity, count(r) as connections
                 ORDER BY connections DESC
-                LIMIT 10
-            """
+                LIMIT $limit
+            """, {"limit": 10})
         }
         
         selected_query = st.selectbox("Select a predefined query:", list(predefined_queries.keys()))
         
         if st.button("🚀 Execute Query", type="primary"):
-            query_text = predefined_queries[selected_query]
+            query_text, query_params = predefined_queries[selected_query]
             with st.spinner("Executing query..."):
-                results, error = execute_query(query_text, "custom")
+                results, error = execute_query(
+                    query_text, "custom", query_params, read_only=True
+                )
                 
                 if error:
                     st.error(error)
-                elif results:
+                elif results is not None and not results.empty:
                     st.success(f"✅ Found {len(results)} results")
                     
-                    # Display results in a table
-                    df = pd.DataFrame(results)
-                    st.dataframe(df, use_container_width=True)
+                    # Display results in a table (Arrow-serialized by Streamlit)
+                    st.dataframe(results, use_container_width=True)
                     
                     # Add to query history
-                    st.session_state.query_history.append({
-                        'timestamp': datetime.now(),
-                        'query': selected_query,
-                        'cypher': query_text,
-                        'results_count': len(results)
-                    })
+                    add_to_history(selected_query, query_text, len(results))
                 else:
                     st.info("No results found")
     
@@ -253,20 +331,14 @@ def main():
                     
                     if error:
                         st.error(error)
-                    elif results:
+                    elif results is not None and not results.empty:
                         st.success(f"✅ Found {len(results)} results")
                         
                         # Display results
-                        df = pd.DataFrame(results)
-                        st.dataframe(df, use_container_width=True)
+                        st.dataframe(results, use_container_width=True)
                         
                         # Add to query history
-                        st.session_state.query_history.append({
-                            'timestamp': datetime.now(),
-                            'query': 'Custom Query',
-                            'cypher': query_text,
-                            'results_count': len(results)
-                        })
+                        add_to_history('Custom Query', query_text, len(results))
                     else:
                         st.info("No results found")
             else:
@@ -275,14 +347,12 @@ def main():
     with tab3:
         st.subheader("Query History")
         
-        if st.session_state.query_history:
-            history_df = pd.DataFrame(st.session_state.query_history)
-            history_df['timestamp'] = history_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-            st.dataframe(history_df, use_container_width=True)
+        if not st.session_state.query_history.empty:
+            st.dataframe(st.session_state.query_history, use_container_width=True)
             
             # Clear history button
             if st.button("🗑️ Clear History"):
-                st.session_state.query_history = []
+                st.session_state.query_history = empty_history()
                 st.rerun()
         else:
             st.info("No query history yet. Run some queries to see them here!")
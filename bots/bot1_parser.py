@@ -8,16 +8,26 @@ from pathlib import Path
 from pypdf import PdfReader, PdfWriter
 import tempfile
 import os
-import json
-from typing import List, Dict, Any
-
-from docling.document_converter import DocumentConverter
+import io
+import ijson
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 # --------------------------------------------------
 # Init
 # --------------------------------------------------
 
-converter = DocumentConverter()
+@lru_cache(maxsize=1)
+def _get_converter():
+    """
+    Lazy Docling singleton: models load on first PDF parse only,
+    so JSON-only runs never pay the import / model cost.
+    """
+    from docling.document_converter import DocumentConverter
+
+    return DocumentConverter()
+
 
 REAL_SECTION_THRESHOLD = 3  # do NOT destroy real structure below this
 
@@ -40,11 +50,10 @@ def parse_document_with_structure(file_path: str, max_pages: int = None) -> dict
     if file_path.suffix.lower() == ".json":
         return parse_json_document_with_structure(str(file_path))
 
-    result = converter.convert(str(file_path))
+    result = _get_converter().convert(str(file_path))
 
     text_content = result.document.export_to_markdown()
-    sections = extract_sections_from_docling(result.document)
-    tables = extract_tables_from_docling(result.document)
+    sections, tables = extract_structure_from_docling(result.document)
 
     # ---- FALLBACK ONLY IF NO REAL HEADINGS ----
     has_real_headings = any(not s.get("synthetic") for s in sections)
@@ -62,6 +71,69 @@ def parse_document_with_structure(file_path: str, max_pages: int = None) -> dict
     }
 
 
+# --------------------------------------------------
+# Structure Extraction (single pass)
+# --------------------------------------------------
+
+_HEADING_LEVELS = {"heading1": 1, "heading2": 2}
+
+
+def _walk_elements(document):
+    """
+    Yield (page_idx, element) for every body element, once.
+    """
+    if not hasattr(document, "pages"):
+        return
+
+    for page_idx, page in enumerate(document.pages):
+        if hasattr(page, "body") and hasattr(page.body, "elements"):
+            for el in page.body.elements:
+                yield page_idx, el
+
+
+def extract_structure_from_docling(
+    document,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Extract headings AND table metadata in ONE traversal
+    of the document elements.
+    """
+    sections = []
+    tables = []
+
+    for page_idx, el in _walk_elements(document):
+        label = getattr(el, "label", None)
+
+        if label in _HEADING_LEVELS:
+            title = el.text.strip() if getattr(el, "text", None) else "Untitled"
+
+            sections.append(
+                {
+                    "section_id": f"section_{len(sections) + 1}",
+                    "title": title,
+                    "level": _HEADING_LEVELS[label],
+                    "page_start": page_idx + 1,
+                    "page_end": page_idx + 1,
+                    "synthetic": False,
+                    "source": "docling_heading",
+                }
+            )
+
+        elif label == "table":
+            tables.append(
+                {
+                    "table_id": f"table_{len(tables) + 1}",
+                    "caption": el.text.strip() if getattr(el, "text", None) else "",
+                    "page": page_idx + 1,
+                    "section_id": None,
+                }
+            )
+
+    _link_sections(sections)
+
+    return sections, tables
+
+
 # --------------------------------------------------
 # Section Extraction
 # --------------------------------------------------
@@ -71,28 +143,13 @@ def extract_sections_from_docling(document) -> List[Dict[str, Any]]:
     Extract H1 / H2 headings with page boundaries.
     Conservative: NEVER destroys real headings.
     """
-    sections = []
+    return extract_structure_from_docling(document)[0]
 
-    if hasattr(document, "pages"):
-        for page_idx, page in enumerate(document.pages):
-            if hasattr(page, "body") and hasattr(page.body, "elements"):
-                for el in page.body.elements:
-                    if getattr(el, "label", None) in ("heading1", "heading2"):
-                        level = 1 if el.label == "heading1" else 2
-                        title = el.text.strip() if getattr(el, "text", None) else "Untitled"
-
-                        sections.append(
-                            {
-                                "section_id": f"section_{len(sections) + 1}",
-                                "title": title,
-                                "level": level,
-                                "page_start": page_idx + 1,
-                                "page_end": page_idx + 1,
-                                "synthetic": False,
-                                "source": "docling_heading",
-                            }
-                        )
 
+def _link_sections(sections: List[Dict[str, Any]]) -> None:
+    """
+    Set parent ids and page ranges in place.
+    """
     # ---- SET PARENTS + PAGE RANGES ----
     for i, sec in enumerate(sections):
         if sec["level"] == 2:
@@ -104,8 +161,6 @@ def extract_sections_from_docling(document) -> List[Dict[str, Any]]:
         if i < len(sections) - 1:
             sec["page_end"] = sections[i + 1]["page_start"] - 1
 
-    return sections
-
 
 # --------------------------------------------------
 # Synthetic Sections (Fallback ONLY)
@@ -145,34 +200,22 @@ def extract_tables_from_docling(document) -> List[Dict[str, Any]]:
     """
     Extract lightweight table metadata (NO cell parsing).
     """
-    tables = []
-
-    if hasattr(document, "pages"):
-        for page_idx, page in enumerate(document.pages):
-            if hasattr(page, "body") and hasattr(page.body, "elements"):
-                for el in page.body.elements:
-                    if getattr(el, "label", None) == "table":
-                        tables.append(
-                            {
-                                "table_id": f"table_{len(tables) + 1}",
-                                "caption": el.text.strip() if getattr(el, "text", None) else "",
-                                "page": page_idx + 1,
-                                "section_id": None,
-                            }
-                        )
-
-    return tables
+    return extract_structure_from_docling(document)[1]
 
 
 def assign_tables_to_sections(tables, sections):
     """
     Deterministically assign tables to their containing section.
+    Section page ranges are contiguous, so a binary search on
+    page_start finds the only candidate section.
     """
+    ordered = sorted(sections, key=lambda s: s["page_start"])
+    starts = [s["page_start"] for s in ordered]
+
     for t in tables:
-        for s in sections:
-            if s["page_start"] <= t["page"] <= s["page_end"]:
-                t["section_id"] = s["section_id"]
-                break
+        i = bisect_right(starts, t["page"]) - 1
+        if i >= 0 and ordered[i]["page_end"] >= t["page"]:
+            t["section_id"] = ordered[i]["section_id"]
 
 
 # --------------------------------------------------
@@ -182,21 +225,24 @@ def assign_tables_to_sections(tables, sections):
 def parse_json_document_with_structure(file_path: str) -> dict:
     """
     Parse pre-extracted JSON consistently.
+    Pages are streamed one at a time (ijson) so the full
+    document tree is never held in memory.
     """
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    markdown = []
+    markdown = io.StringIO()
+    has_markdown = False
     sections = []
     current_page = 0
 
-    if "pages" in data:
-        for i, page in enumerate(data["pages"]):
+    with open(file_path, "rb") as f:
+        for i, page in enumerate(ijson.items(f, "pages.item")):
             current_page = i + 1
 
             for el in page.get("elements", []):
                 if "content" in el and "markdown" in el["content"]:
-                    markdown.append(el["content"]["markdown"])
+                    if has_markdown:
+                        markdown.write("\n\n")
+                    markdown.write(el["content"]["markdown"])
+                    has_markdown = True
 
                 if el.get("type") == "heading" and el.get("level") in (1, 2):
                     sections.append(
@@ -218,7 +264,7 @@ def parse_json_document_with_structure(file_path: str) -> dict:
             s["page_end"] = current_page
 
     return {
-        "text": "\n\n".join(markdown),
+        "text": markdown.getvalue(),
         "sections": sections,
         "tables": [],
     }
@@ -253,5 +299,5 @@ def parse_document_with_limit(file_path: str, max_pages: int = None) -> str:
 
 
 def parse_document(file_path: str) -> str:
-    result = converter.convert(str(file_path))
+    result = _get_converter().convert(str(file_path))
     return result.document.export_to_markdown()
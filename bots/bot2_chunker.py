@@ -9,9 +9,10 @@ NO graph logic
 NO references
 """
 
+import os
 import re
 import tiktoken
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterator
 
 from config.settings import (
     CHUNK_SIZE,
@@ -35,18 +36,29 @@ def get_encoder():
     return _ENCODER
 
 
+# tiktoken's batch APIs run BPE in native threads (GIL released)
+_ENCODE_THREADS = os.cpu_count() or 1
+
+
 # --------------------------------------------------
 # Text Normalization
 # --------------------------------------------------
 
+_RE_BLANK_LINES = re.compile(r"\n{3,}")
+_RE_INLINE_WS = re.compile(r"[ \t]{2,}")
+# Any whitespace except the newline itself (NBSP, \f, ... as rstrip())
+_RE_TRAILING_WS = re.compile(r"[^\S\n]+$", re.MULTILINE)
+
+
 def normalize_text(text: str) -> str:
     """
     Normalize whitespace without altering semantics.
     """
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]{2,}", " ", text)
-    lines = [line.rstrip() for line in text.splitlines()]
-    return "\n".join(lines).strip()
+    text = _RE_BLANK_LINES.sub("\n\n", text)
+    text = _RE_INLINE_WS.sub(" ", text)
+    # Every line break splitlines() knows (\r, \x0c, \u2028, ...) → \n
+    text = "\n".join(text.splitlines())
+    return _RE_TRAILING_WS.sub("", text).strip()
 
 
 # --------------------------------------------------
@@ -61,17 +73,35 @@ def chunk_by_tokens(
     text: str,
     chunk_size: int,
     overlap: int,
-) -> List[str]:
+) -> Iterator[Tuple[str, int]]:
     """
     Token-based chunking with strict safety caps.
+    Lazily yields (chunk_text, token_count) pairs: callers never
+    re-encode, and decoded chunks are never all held at once.
     """
     encoder = get_encoder()
     tokens = encoder.encode(text)
 
     if len(tokens) <= chunk_size:
-        return [text]
+        yield text, len(tokens)
+        return
+
+    for chunk_tokens in _iter_token_windows(tokens, chunk_size, overlap):
+        yield encoder.decode(chunk_tokens), len(chunk_tokens)
+
+
+def _iter_token_windows(
+    tokens: List[int],
+    chunk_size: int,
+    overlap: int,
+) -> Iterator[List[int]]:
+    """
+    Slice a token list into overlapping windows.
+    """
+    if len(tokens) <= chunk_size:
+        yield tokens
+        return
 
-    chunks = []
     start = 0
 
     while start < len(tokens):
@@ -82,15 +112,13 @@ def chunk_by_tokens(
         if len(chunk_tokens) > MAX_CHUNK_SIZE:
             raise ValueError("Chunk exceeds MAX_CHUNK_SIZE safety limit")
 
-        chunks.append(encoder.decode(chunk_tokens))
+        yield chunk_tokens
 
         if end == len(tokens):
             break
 
         start = max(end - overlap, start + 1)
 
-    return chunks
-
 
 # --------------------------------------------------
 # Section-Aware Chunking
@@ -109,14 +137,35 @@ def build_chunks_from_sections(
     normalized = normalize_text(full_text)
     chunks: List[Dict[str, Any]] = []
 
-    for section in sections:
-        section_text = extract_text_for_section(
-            normalized,
-            section,
-        )
+    encoder = get_encoder()
+    section_texts = [
+        extract_text_for_section(normalized, section)
+        for section in sections
+    ]
+
+    # ---- Encode all non-empty sections in one batch ----
+    non_empty = [i for i, t in enumerate(section_texts) if t.strip()]
+    token_lists = encoder.encode_batch(
+        [section_texts[i] for i in non_empty],
+        num_threads=_ENCODE_THREADS,
+    )
+
+    section_slices = {
+        i: list(_iter_token_windows(tokens, chunk_size, overlap))
+        for i, tokens in zip(non_empty, token_lists)
+    }
+
+    # ---- Decode every multi-chunk slice in one batch ----
+    decoded = iter(encoder.decode_batch(
+        [sl for slices in section_slices.values() if len(slices) > 1 for sl in slices],
+        num_threads=_ENCODE_THREADS,
+    ))
+
+    for i, section in enumerate(sections):
+        section_text = section_texts[i]
 
         # Explicit empty-section marker
-        if not section_text.strip():
+        if i not in section_slices:
             chunks.append(_make_chunk(
                 text="",
                 section=section,
@@ -124,16 +173,19 @@ def build_chunks_from_sections(
                 chunk_in_section=1,
                 global_index=len(chunks),
                 is_empty=True,
+                token_count=0,
             ))
             continue
 
-        section_chunks = chunk_by_tokens(
-            section_text,
-            chunk_size=chunk_size,
-            overlap=overlap,
-        )
+        slices = section_slices[i]
 
-        for idx, chunk_text in enumerate(section_chunks, start=1):
+        # Single-chunk sections keep their original text verbatim
+        if len(slices) == 1:
+            section_chunks = [(section_text, len(slices[0]))]
+        else:
+            section_chunks = [(next(decoded), len(sl)) for sl in slices]
+
+        for idx, (chunk_text, token_count) in enumerate(section_chunks, start=1):
             chunks.append(_make_chunk(
                 text=chunk_text,
                 section=section,
@@ -141,6 +193,7 @@ def build_chunks_from_sections(
                 chunk_in_section=idx,
                 global_index=len(chunks),
                 is_empty=False,
+                token_count=token_count,
             ))
 
     return chunks
@@ -168,6 +221,7 @@ def _make_chunk(
     chunk_in_section: int,
     global_index: int,
     is_empty: bool,
+    token_count: int,
 ) -> Dict[str, Any]:
     chunk_id = f"{doc_id}:{section['section_id']}:{chunk_in_section}"
 
@@ -182,7 +236,7 @@ def _make_chunk(
         "page_start": section.get("page_start"),
         "page_end": section.get("page_end"),
         "text": text,
-        "token_count": count_tokens(text),
+        "token_count": token_count,
         "is_empty": is_empty,
     }
 
@@ -200,9 +254,10 @@ def build_chunks_without_sections(
     normalized = normalize_text(text)
     chunks = []
 
-    chunk_texts = chunk_by_tokens(normalized, chunk_size, overlap)
-
-    for idx, ctext in enumerate(chunk_texts, start=1):
+    for idx, (ctext, token_count) in enumerate(
+        chunk_by_tokens(normalized, chunk_size, overlap),
+        start=1,
+    ):
         chunks.append({
             "chunk_id": f"{doc_id}:section_0:{idx}",
             "chunk_index": idx - 1,
@@ -214,7 +269,7 @@ def build_chunks_without_sections(
             "page_start": 1,
             "page_end": None,
             "text": ctext,
-            "token_count": count_tokens(ctext),
+            "token_count": token_count,
             "is_empty": False,
         })
 
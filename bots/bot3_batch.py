@@ -0,0 +1,223 @@
+"""
+Bot 3 (Batch): Offline Entity & Relationship Extraction
+------------------------------------------------------
+Same prompt + schema as Bot 3, submitted as ONE OpenAI Batch API job.
+
+- ~50% token cost vs interactive calls
+- Throughput bounded by the batch window, not per-request latency
+- OpenAI ONLY (no Groq batch fallback)
+- Returns the same {"entities", "relationships"} dicts as Bot 3,
+  so persist_extraction is unchanged
+- Same pre-LLM filter (is_extractable) and same utils.llm_cache keys
+  as Bot 3, so the two paths are interchangeable
+"""
+
+import time
+import orjson
+from typing import List, Dict, Any, Optional, Collection
+
+from config.settings import OPENAI_LLM_MODEL, MAX_COMPLETION_TOKENS, LLM_TEMPERATURE
+from bots.bot3_extractor import (
+    openai_client,
+    OPENAI_RESPONSE_FORMAT,
+    _build_messages,
+    _cache_key,
+    is_extractable,
+    parse_extraction_content,
+)
+from utils import llm_cache
+
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Give up (and cancel) well before the 24h completion window
+BATCH_TIMEOUT = 6 * 60 * 60  # seconds
+
+
+def _empty_extraction() -> Dict[str, Any]:
+    return {"entities": [], "relationships": []}
+
+
+# ==================================================
+# Request File
+# ==================================================
+
+def _custom_id(index: int, section_id: str) -> str:
+    # Index keeps ids unique when several chunks share a section_id
+    return f"{index}:{section_id}"
+
+
+def _wants_llm(section: Dict[str, Any]) -> bool:
+    # Same skip rule as bot3_extractor.extract_sections
+    return not section.get("is_empty") and is_extractable(section.get("text", ""))
+
+
+def build_batch_file(
+    sections: List[Dict[str, Any]],
+    skip: Collection[int] = (),
+) -> bytes:
+    """
+    One JSONL line per extractable section.
+    Indices in `skip` (already answered from the cache) are left out.
+    """
+    lines = []
+
+    for i, s in enumerate(sections):
+        if i in skip or not _wants_llm(s):
+            continue
+        text = s["text"]
+
+        lines.append(orjson.dumps({
+            "custom_id": _custom_id(i, s["section_id"]),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": OPENAI_LLM_MODEL,
+                "messages": _build_messages(text, s["section_id"]),
+                "temperature": LLM_TEMPERATURE,
+                "max_tokens": MAX_COMPLETION_TOKENS,
+                "response_format": OPENAI_RESPONSE_FORMAT,
+            },
+        }))
+
+    return b"\n".join(lines)
+
+
+# ==================================================
+# Job Lifecycle
+# ==================================================
+
+def submit_batch(
+    sections: List[Dict[str, Any]],
+    skip: Collection[int] = (),
+) -> Optional[str]:
+    """
+    Upload the request file and create the batch job.
+    Returns the batch id (None if nothing to extract).
+    """
+    if not openai_client:
+        raise RuntimeError("OpenAI Batch API requires OPENAI_API_KEY")
+
+    payload = build_batch_file(sections, skip)
+    if not payload:
+        return None
+
+    upload = openai_client.files.create(
+        file=("bot3_batch.jsonl", payload),
+        purpose="batch",
+    )
+
+    batch = openai_client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    n_requests = payload.count(b"\n") + 1
+    print(f"[Bot3-Batch] Submitted {batch.id} ({n_requests} requests)")
+    return batch.id
+
+
+def wait_for_batch(
+    batch_id: str,
+    poll_interval: float = 30.0,
+    timeout: float = BATCH_TIMEOUT,
+):
+    """
+    Poll until the batch reaches a terminal status.
+    Past `timeout` seconds the batch is cancelled and TimeoutError raised.
+    """
+    deadline = time.monotonic() + timeout
+
+    while True:
+        batch = openai_client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            print(f"[Bot3-Batch] {batch_id} finished: {batch.status}")
+            return batch
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            openai_client.batches.cancel(batch_id)
+            raise TimeoutError(
+                f"Batch {batch_id} still {batch.status} after {timeout:.0f}s; cancelled"
+            )
+
+        time.sleep(min(poll_interval, remaining))
+
+
+def collect_batch_results(batch) -> Dict[str, Dict[str, Any]]:
+    """
+    Download the output file → {custom_id: extraction}.
+    Failed lines are skipped (callers fall back to empty).
+    """
+    results = {}
+
+    if not batch.output_file_id:
+        return results
+
+    content = openai_client.files.content(batch.output_file_id).content
+
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+
+        try:
+            item = orjson.loads(line)
+            body = item["response"]["body"]
+            results[item["custom_id"]] = parse_extraction_content(
+                body["choices"][0]["message"]["content"]
+            )
+        except Exception as e:
+            print(f"[Bot3-Batch] Skipping unparsable result line: {e}")
+
+    return results
+
+
+# ==================================================
+# Entry Point
+# ==================================================
+
+def extract_sections_via_batch(
+    sections: List[Dict[str, Any]],
+    poll_interval: float = 30.0,
+    timeout: float = BATCH_TIMEOUT,
+    read_cache: bool = False,
+    write_cache: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Submit, wait, and return extractions in input order.
+    Sections without a result get an empty extraction.
+    read_cache / write_cache: as in bot3_extractor.extract_sections
+    (cache hits are never submitted).
+    """
+    cached = {}
+    if read_cache:
+        for i, s in enumerate(sections):
+            if _wants_llm(s):
+                hit = llm_cache.load(_cache_key(s["text"], s["section_id"]))
+                if hit is not None:
+                    cached[i] = hit
+
+    results = {}
+    batch_id = submit_batch(sections, skip=cached)
+    if batch_id is not None:
+        results = collect_batch_results(
+            wait_for_batch(batch_id, poll_interval, timeout)
+        )
+
+    extractions = []
+    for i, s in enumerate(sections):
+        if i in cached:
+            extractions.append(cached[i])
+            continue
+
+        extraction = results.get(_custom_id(i, s["section_id"]))
+        if extraction is None:
+            extractions.append(_empty_extraction())
+            continue
+
+        if write_cache:
+            llm_cache.store(_cache_key(s["text"], s["section_id"]), extraction)
+        extractions.append(extraction)
+
+    return extractions
@@ -8,13 +8,28 @@ GUARANTEES:
 - Never breaks JSON parsing
 - Never hallucinates structure
 - Returns empty safely on failure
+
+BATCH WRITES:
+- to_unwind_payload() returns row dicts keyed on Cypher parameter names,
+  so ingestion can write a whole extraction in one round-trip:
+    UNWIND $rows AS r
+    MERGE (e:Entity {doc_id: $doc_id, name: r.name}) SET e += r
+
+CONCURRENCY:
+- Extraction is I/O-bound (one LLM call per section, no local NLP),
+  so it scales with asyncio (extract_many), not worker processes.
+  The only CPU work — JSON parse + to_unwind_payload — is microseconds
+  per section and would cost more to pickle than to run.
 """
 
-import json
-from typing import List, Dict, Any
+import asyncio
+import orjson
+from typing import List, Dict, Any, Tuple
+
+from tqdm import tqdm
 
-from openai import OpenAI
-from groq import Groq
+from openai import OpenAI, AsyncOpenAI
+from groq import Groq, AsyncGroq
 
 from config.settings import (
     OPENAI_API_KEY,
@@ -23,9 +38,73 @@ from config.settings import (
     GROQ_LLM_MODEL,
     MAX_COMPLETION_TOKENS,
     LLM_TEMPERATURE,
+    LLM_MAX_CONCURRENCY,
 )
 
 from database.neo4j_client import Neo4jClient
+from utils import llm_cache
+
+
+# ==================================================
+# Structured Output Schema (OpenAI strict mode)
+# ==================================================
+
+ENTITY_TYPES = [
+    "PERSON", "ORGANIZATION", "FINANCIAL", "GOVERNANCE",
+    "RISK", "CONCEPT", "EVENT", "OTHER",
+]
+
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "entities": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string", "enum": ENTITY_TYPES},
+                    "description": {"type": "string"},
+                    "salience": {
+                        "type": "string",
+                        "enum": ["CORE", "IMPORTANT", "SUPPORTING"],
+                    },
+                },
+                "required": ["name", "type", "description", "salience"],
+                "additionalProperties": False,
+            },
+        },
+        "relationships": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "source": {"type": "string"},
+                    "target": {"type": "string"},
+                    "type": {
+                        "type": "string",
+                        "enum": ["DEFINES", "DETAILS", "REFERS_TO", "ASSOCIATED_WITH"],
+                    },
+                    "description": {"type": "string"},
+                },
+                "required": ["source", "target", "type", "description"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["entities", "relationships"],
+    "additionalProperties": False,
+}
+
+# Decode-time constrained output: valid JSON on the first try
+OPENAI_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "extraction",
+        "strict": True,
+        "schema": EXTRACTION_SCHEMA,
+    },
+}
 
 
 # ==================================================
@@ -38,20 +117,56 @@ groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
 
 def chat_completion(messages):
     """OpenAI primary, Groq fallback"""
+    return _chat_completion_with_provider(messages)[1]
+
+
+def _chat_completion_with_provider(messages) -> Tuple[str, Any]:
+    """chat_completion, plus which provider answered ("openai" / "groq")"""
     if openai_client:
         try:
-            return openai_client.chat.completions.create(
+            return "openai", openai_client.chat.completions.create(
                 model=OPENAI_LLM_MODEL,
                 messages=messages,
                 temperature=LLM_TEMPERATURE,
                 max_tokens=MAX_COMPLETION_TOKENS,
-                response_format={"type": "json_object"},
+                response_format=OPENAI_RESPONSE_FORMAT,
             )
         except Exception as e:
             print(f"[Bot3] OpenAI failed → Groq fallback: {e}")
 
+    # Groq fallback keeps JSON mode (json_schema support varies by model)
     if groq_client:
-        return groq_client.chat.completions.create(
+        return "groq", groq_client.chat.completions.create(
+            model=GROQ_LLM_MODEL,
+            messages=messages,
+            temperature=LLM_TEMPERATURE,
+            max_tokens=MAX_COMPLETION_TOKENS,
+            response_format={"type": "json_object"},
+        )
+
+    raise RuntimeError("No LLM provider available")
+
+
+async def chat_completion_async(messages, aio_openai, aio_groq):
+    """Async mirror of chat_completion (OpenAI primary, Groq fallback)"""
+    return (await _chat_completion_with_provider_async(messages, aio_openai, aio_groq))[1]
+
+
+async def _chat_completion_with_provider_async(messages, aio_openai, aio_groq) -> Tuple[str, Any]:
+    if aio_openai:
+        try:
+            return "openai", await aio_openai.chat.completions.create(
+                model=OPENAI_LLM_MODEL,
+                messages=messages,
+                temperature=LLM_TEMPERATURE,
+                max_tokens=MAX_COMPLETION_TOKENS,
+                response_format=OPENAI_RESPONSE_FORMAT,
+            )
+        except Exception as e:
+            print(f"[Bot3] OpenAI failed → Groq fallback: {e}")
+
+    if aio_groq:
+        return "groq", await aio_groq.chat.completions.create(
             model=GROQ_LLM_MODEL,
             messages=messages,
             temperature=LLM_TEMPERATURE,
@@ -119,12 +234,14 @@ TEXT:
 # Helpers
 # ==================================================
 
-ALLOWED_REL_TYPES = {
+ALLOWED_REL_TYPES = frozenset({
     "DEFINES",
     "DETAILS",
     "REFERS_TO",
     "ASSOCIATED_WITH",
-}
+})
+
+ALLOWED_SALIENCE = frozenset({"CORE", "IMPORTANT", "SUPPORTING"})
 
 
 def _safe_list(v):
@@ -135,120 +252,274 @@ def normalize_name(name: str) -> str:
     return " ".join(name.strip().split()) if name else ""
 
 
+def to_unwind_payload(
+    entities: List[Dict[str, Any]],
+    relationships: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Normalize raw extraction output into UNWIND-ready rows.
+    Invalid entities / relationships are dropped here, once.
+    """
+    entity_rows = []
+    for e in entities:
+        name = normalize_name(e.get("name"))
+        if not name:
+            continue
+
+        salience = e.get("salience", "SUPPORTING")
+        if salience not in ALLOWED_SALIENCE:
+            salience = "SUPPORTING"
+
+        entity_rows.append({
+            "name": name,
+            "type": e.get("type", "OTHER"),
+            "description": e.get("description", ""),
+            "salience": salience,
+        })
+
+    relationship_rows = []
+    for r in relationships:
+        rel_type = (r.get("type") or "").upper()
+        if rel_type not in ALLOWED_REL_TYPES:
+            continue
+
+        src = normalize_name(r.get("source"))
+        tgt = normalize_name(r.get("target"))
+
+        if not src or not tgt or src == tgt:
+            continue
+
+        relationship_rows.append({
+            "source": src,
+            "target": tgt,
+            "type": rel_type,
+            "description": r.get("description", ""),
+        })
+
+    return entity_rows, relationship_rows
+
+
 # ==================================================
 # Extraction
 # ==================================================
 
+# Below these, a chunk is boilerplate (TOC lines, page footers, number
+# grids) and not worth an LLM round-trip
+MIN_EXTRACT_CHARS = 200
+MIN_ALPHA_RATIO = 0.3
+
+
+def is_extractable(text: str) -> bool:
+    """Cheap pre-LLM filter: enough text, and mostly letters."""
+    if not text or len(text) <= MIN_EXTRACT_CHARS:
+        return False
+    return sum(c.isalpha() for c in text) / len(text) > MIN_ALPHA_RATIO
+
+
+def _build_messages(text: str, section_id: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": "Return valid JSON only.",
+        },
+        {
+            "role": "user",
+            "content": EXTRACTION_PROMPT
+            + f"\n[SECTION: {section_id}]\n"
+            + text,
+        },
+    ]
+
+
+def _parse_extraction(response) -> Dict[str, Any]:
+    return parse_extraction_content(response.choices[0].message.content)
+
+
+def parse_extraction_content(content: str) -> Dict[str, Any]:
+    # ---- ABSOLUTE JSON PARSE ----
+    raw = orjson.loads(content)
+
+    return {
+        "entities": _safe_list(raw.get("entities"))[:25],
+        "relationships": _safe_list(raw.get("relationships"))[:30],
+    }
+
+
+def _cache_key(text: str, section_id: str) -> str:
+    # Everything that shapes the OpenAI response; a prompt or schema
+    # edit invalidates all. Only OpenAI answers are ever stored.
+    return llm_cache.cache_key(
+        OPENAI_LLM_MODEL,
+        orjson.dumps(OPENAI_RESPONSE_FORMAT, option=orjson.OPT_SORT_KEYS).decode(),
+        str(LLM_TEMPERATURE),
+        str(MAX_COMPLETION_TOKENS),
+        EXTRACTION_PROMPT,
+        section_id,
+        text,
+    )
+
+
 def extract_entities_and_relationships(
     text: str,
     section_id: str,
     is_empty: bool = False,
+    read_cache: bool = False,
+    write_cache: bool = False,
 ) -> Dict[str, Any]:
+    """
+    read_cache / write_cache: replay / record successful extractions
+    in utils.llm_cache (failures and Groq fallbacks are never cached).
+    """
 
     if is_empty or not text.strip():
         return {"entities": [], "relationships": []}
 
+    key = _cache_key(text, section_id) if read_cache or write_cache else None
+    if read_cache:
+        cached = llm_cache.load(key)
+        if cached is not None:
+            return cached
+
     try:
-        response = chat_completion(
-            [
-                {
-                    "role": "system",
-                    "content": "Return valid JSON only.",
-                },
-                {
-                    "role": "user",
-                    "content": EXTRACTION_PROMPT
-                    + f"\n[SECTION: {section_id}]\n"
-                    + text,
-                },
-            ]
+        provider, response = _chat_completion_with_provider(
+            _build_messages(text, section_id)
         )
+        extraction = _parse_extraction(response)
+
+    except Exception as e:
+        print(f"[Bot3] Extraction failed safely for {section_id}: {e}")
+        return {"entities": [], "relationships": []}
+
+    if write_cache and provider == "openai":
+        llm_cache.store(key, extraction)
+    return extraction
+
+
+async def extract_entities_and_relationships_async(
+    text: str,
+    section_id: str,
+    aio_openai,
+    aio_groq,
+    is_empty: bool = False,
+    read_cache: bool = False,
+    write_cache: bool = False,
+) -> Dict[str, Any]:
 
-        content = response.choices[0].message.content
+    if is_empty or not text.strip():
+        return {"entities": [], "relationships": []}
 
-        # ---- ABSOLUTE JSON PARSE ----
-        raw = json.loads(content)
+    key = _cache_key(text, section_id) if read_cache or write_cache else None
+    if read_cache:
+        cached = llm_cache.load(key)
+        if cached is not None:
+            return cached
 
-        return {
-            "entities": _safe_list(raw.get("entities"))[:25],
-            "relationships": _safe_list(raw.get("relationships"))[:30],
-        }
+    try:
+        provider, response = await _chat_completion_with_provider_async(
+            _build_messages(text, section_id),
+            aio_openai,
+            aio_groq,
+        )
+        extraction = _parse_extraction(response)
 
     except Exception as e:
         print(f"[Bot3] Extraction failed safely for {section_id}: {e}")
         return {"entities": [], "relationships": []}
 
+    if write_cache and provider == "openai":
+        llm_cache.store(key, extraction)
+    return extraction
+
+
+async def extract_many(
+    sections: List[Dict[str, Any]],
+    max_concurrency: int = LLM_MAX_CONCURRENCY,
+    read_cache: bool = False,
+    write_cache: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Extract many sections concurrently.
+    - sections: [{"section_id", "text", "is_empty"?}]
+    - At most `max_concurrency` LLM calls in flight (rate limits)
+    - Results are returned in input order
+    """
+    # Async clients are created per run: their HTTP pools are bound
+    # to the event loop that asyncio.run() creates.
+    aio_openai = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+    aio_groq = AsyncGroq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    # Throughput / ETA for long documents (updated as calls complete)
+    progress = tqdm(total=len(sections), desc="Bot 3 extraction", unit="chunk")
+
+    async def bounded(section):
+        async with sem:
+            result = await extract_entities_and_relationships_async(
+                section.get("text", ""),
+                section["section_id"],
+                aio_openai,
+                aio_groq,
+                is_empty=section.get("is_empty", False),
+                read_cache=read_cache,
+                write_cache=write_cache,
+            )
+        progress.update(1)
+        return result
+
+    try:
+        return await asyncio.gather(*[bounded(s) for s in sections])
+    finally:
+        progress.close()
+        for client in (aio_openai, aio_groq):
+            if client is not None:
+                await client.close()
+
 
 # ==================================================
 # Persistence
 # ==================================================
 
+# Sections committed per transaction (≈25 entities + 30 edges each)
+PERSIST_BATCH_SECTIONS = 40
+
 def persist_extraction(
     extraction: Dict[str, Any],
     section_id: str,
     neo4j: Neo4jClient,
     doc_id: str,
+    session=None,
 ) -> Dict[str, int]:
 
-    entities_written = 0
-    relationships_written = 0
-
         # ---- ENSURE SECTION NODE EXISTS ----
     neo4j.create_section(
         section_id=section_id,
         title=section_id,      # title optional here
         level=1,               # safe default
         doc_id=doc_id,
+        session=session,
     )
 
 
-    # ---- Entities ----
-    for e in extraction["entities"]:
-        name = normalize_name(e.get("name"))
-        if not name:
-            continue
-
-        salience = e.get("salience", "SUPPORTING")
-        if salience not in {"CORE", "IMPORTANT", "SUPPORTING"}:
-            salience = "SUPPORTING"
-
-        created = neo4j.create_entity(
-            name=name,
-            entity_type=e.get("type", "OTHER"),
-            description=e.get("description", ""),
-            salience=salience,
-        )
-
-        neo4j.link_entity_to_section(
-            entity_name=name,
-            section_id=section_id,
-            doc_id=doc_id,
-        )
-
-        if created:
-            entities_written += 1
-
-    # ---- Relationships ----
-    for r in extraction["relationships"]:
-        rel_type = r.get("type", "").upper()
-        if rel_type not in ALLOWED_REL_TYPES:
-            continue
-
-        src = normalize_name(r.get("source"))
-        tgt = normalize_name(r.get("target"))
-
-        if not src or not tgt or src == tgt:
-            continue
+    entity_rows, relationship_rows = to_unwind_payload(
+        extraction["entities"],
+        extraction["relationships"],
+    )
 
-        created = neo4j.create_relationship(
-            source_name=src,
-            target_name=tgt,
-            rel_type=rel_type,
-            description=r.get("description", ""),
-        )
+    # ---- Entities (+ MENTIONS links): one UNWIND ----
+    entities_written = neo4j.create_entities_batch(
+        entity_rows,
+        section_id=section_id,
+        doc_id=doc_id,
+        session=session,
+    )
 
-        if created:
-            relationships_written += 1
+    # ---- Relationships: one UNWIND per type ----
+    relationships_written = neo4j.create_relationships_batch(
+        relationship_rows,
+        doc_id=doc_id,
+        session=session,
+    )
 
     return {
         "entities": entities_written,
@@ -266,12 +537,103 @@ def process_section_text(
     neo4j: Neo4jClient,
     doc_id: str,
     is_empty: bool = False,
+    read_cache: bool = False,
+    write_cache: bool = False,
+    session=None,
 ) -> Dict[str, int]:
 
     extraction = extract_entities_and_relationships(
         section_text,
         section_id,
         is_empty=is_empty,
+        read_cache=read_cache,
+        write_cache=write_cache,
+    )
+
+    return persist_extraction(extraction, section_id, neo4j, doc_id, session=session)
+
+
+def extract_sections(
+    sections: List[Dict[str, Any]],
+    concurrency: int = LLM_MAX_CONCURRENCY,
+    read_cache: bool = False,
+    write_cache: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    LLM phase only: concurrent (bounded) extraction for ALL sections.
+    Touches no database, so callers can run it before opening a
+    transaction. Returns one extraction per section, in input order.
+    """
+    # Boilerplate chunks go through as empty (Section node still written)
+    skipped = 0
+    prepared = []
+    for section in sections:
+        if not section.get("is_empty") and not is_extractable(section.get("text", "")):
+            section = {**section, "is_empty": True}
+            skipped += 1
+        prepared.append(section)
+
+    if skipped:
+        print(f"[Bot3] Skipped {skipped}/{len(sections)} short or non-text chunks")
+
+    return asyncio.run(extract_many(
+        prepared,
+        max_concurrency=concurrency,
+        read_cache=read_cache,
+        write_cache=write_cache,
+    ))
+
+
+def persist_extractions(
+    sections: List[Dict[str, Any]],
+    extractions: List[Dict[str, Any]],
+    neo4j: Neo4jClient,
+    doc_id: str,
+    session=None,
+) -> List[Dict[str, int]]:
+    """
+    Write phase: serial (avoids Neo4j node-lock contention),
+    PERSIST_BATCH_SECTIONS sections per transaction — or all of them
+    inside the caller's transaction when `session` is one.
+    """
+    results = []
+    for i in range(0, len(sections), PERSIST_BATCH_SECTIONS):
+        group = zip(
+            sections[i:i + PERSIST_BATCH_SECTIONS],
+            extractions[i:i + PERSIST_BATCH_SECTIONS],
+        )
+        results.extend(neo4j.batch(
+            (
+                lambda tx, s=section, x=extraction: persist_extraction(
+                    x, s["section_id"], neo4j, doc_id, session=tx
+                )
+                for section, extraction in group
+            ),
+            session=session,
+        ))
+
+    return results
+
+
+def process_sections_batch(
+    sections: List[Dict[str, Any]],
+    neo4j: Neo4jClient,
+    doc_id: str,
+    concurrency: int = LLM_MAX_CONCURRENCY,
+    session=None,
+    read_cache: bool = False,
+    write_cache: bool = False,
+) -> List[Dict[str, int]]:
+    """
+    Batch entry point: extract_sections() then persist_extractions()
+    - sections: [{"section_id", "text", "is_empty"?}]
+    Returns per-section write counts, in input order.
+    """
+    extractions = extract_sections(
+        sections,
+        concurrency=concurrency,
+        read_cache=read_cache,
+        write_cache=write_cache,
     )
 
-    return persist_extraction(extraction, section_id, neo4j, doc_id)
+    return persist_extractions(sections, extractions, neo4j, doc_id, session=session)
@@ -3,59 +3,165 @@ Bot 4: Reference Extraction (Deterministic)
 ------------------------------------------
 - Extract cross-section references, tables, figures
 - NO LLMs
-- NO database writes
 - PURE text -> structured signals
+- Persistence is a SEPARATE step (extract_and_persist_references)
 """
 
 import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Iterator
+
+from utils.pattern_scan import compile_hyperscan, hyperscan_finditer
 
 
 # -----------------------------
-# Cross-section references
+# Patterns (compiled ONCE)
 # -----------------------------
 
-def extract_cross_section_references(
+# (pattern, kind) — the LAST group of every pattern is the locator.
+# FIGURE covers every figure mention; only "figure N" / "fig. N"
+# (groups 1 / 2) also count as references.
+SCAN_PATTERNS = [
+    (r'\bpage\s+(\d+)\b', "PAGE"),
+    (r'\bsection\s+(\d+(?:\.\d+)*)\b', "SECTION"),
+    (r'\bappendix\s+([A-Z])\b', "APPENDIX"),
+    (r'\btable\s+(\d+(?:\.\d+)*)\b', "TABLE"),
+    (r'\bfig(?:(ure\s+)|(\.\s*)|(?:ure)?\.?\s*)(\d+(?:\.\d+)*)\b', "FIGURE"),
+]
+
+# One alternation → one scan of the text for references, tables and figures.
+# Alternatives start with distinct keywords, so no match is lost.
+_SCAN_RE = re.compile(
+    "|".join(f"(?P<k{i}>{p})" for i, (p, _) in enumerate(SCAN_PATTERNS)),
+    re.IGNORECASE,
+)
+
+# group name → (kind, first inner group index, inner group count)
+_SCAN_GROUPS = {
+    f"k{i}": (kind, _SCAN_RE.groupindex[f"k{i}"] + 1, re.compile(p).groups)
+    for i, (p, kind) in enumerate(SCAN_PATTERNS)
+}
+
+# Optional Hyperscan DFA (None → use _SCAN_RE)
+_SCAN_REGEXES = [re.compile(p, re.IGNORECASE) for p, _ in SCAN_PATTERNS]
+_SCAN_HS_DB = compile_hyperscan([p for p, _ in SCAN_PATTERNS])
+
+REFERENCE_CUES = ("see", "refer", "defined", "detailed", "explained", "shown")
+
+
+def _iter_scan_matches(text: str) -> Iterator[Tuple[str, int, int, tuple]]:
+    """
+    Yield (kind, start, end, groups) in text order.
+    """
+    if _SCAN_HS_DB is not None:
+        hits = sorted(
+            hyperscan_finditer(_SCAN_HS_DB, _SCAN_REGEXES, text),
+            key=lambda hit: hit[1].start(),
+        )
+        for pattern_id, m in hits:
+            yield SCAN_PATTERNS[pattern_id][1], m.start(), m.end(), m.groups()
+        return
+
+    for m in _SCAN_RE.finditer(text):
+        kind, first, count = _SCAN_GROUPS[m.lastgroup]
+        yield kind, m.start(), m.end(), tuple(m.group(g) for g in range(first, first + count))
+
+
+# -----------------------------
+# Single-pass section scan
+# -----------------------------
+
+def scan_section(
     text: str,
     section_id: str,
     doc_id: str,
-) -> List[Dict[str, Any]]:
+) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Extract high-confidence cross-section references using regex + heuristics.
+    Extract references, table mentions and figure mentions in ONE pass.
     """
 
     references: List[Dict[str, Any]] = []
-
-    patterns = [
-        (r'\bpage\s+(\d+)\b', "PAGE"),
-        (r'\bsection\s+(\d+(?:\.\d+)*)\b', "SECTION"),
-        (r'\bappendix\s+([A-Z])\b', "APPENDIX"),
-        (r'\btable\s+(\d+(?:\.\d+)*)\b', "TABLE"),
-        (r'\bfigure\s+(\d+(?:\.\d+)*)\b', "FIGURE"),
-        (r'\bfig\.\s*(\d+(?:\.\d+)*)\b', "FIGURE"),
-    ]
-
-    for pattern, ref_type in patterns:
-        for match in re.finditer(pattern, text, flags=re.IGNORECASE):
-            start, end = match.start(), match.end()
-            locator = match.group(1)
-
-            window = text[max(0, start - 60): min(len(text), end + 60)].lower()
-            if not any(k in window for k in (
-                "see", "refer", "defined", "detailed", "explained", "shown"
-            )):
+    tables: List[Dict[str, Any]] = []
+    figures: List[Dict[str, Any]] = []
+
+    seen_refs = set()
+    seen_tables = set()
+    seen_figures = set()
+
+    # Lower once and slice windows from it. A few characters (e.g. "İ")
+    # change length when lowered — then offsets no longer line up.
+    text_lower = text.lower()
+    aligned = len(text_lower) == len(text)
+
+    for kind, start, end, groups in _iter_scan_matches(text):
+        locator = groups[-1]
+
+        # ---- Table / figure mentions ----
+        if kind == "TABLE":
+            table_id = f"{doc_id}:table:{locator}"
+            if table_id not in seen_tables:
+                seen_tables.add(table_id)
+                tables.append({
+                    "table_id": table_id,
+                    "label": locator,
+                    "section_id": section_id,
+                    "doc_id": doc_id,
+                })
+
+        elif kind == "FIGURE":
+            figure_id = f"{doc_id}:figure:{locator}"
+            if figure_id not in seen_figures:
+                seen_figures.add(figure_id)
+                figures.append({
+                    "figure_id": figure_id,
+                    "label": locator,
+                    "section_id": section_id,
+                    "doc_id": doc_id,
+                })
+
+            # "fig 3" / "figure.3" are mentions, not references
+            if groups[0] is None and groups[1] is None:
                 continue
 
-            references.append({
-                "reference_id": f"{doc_id}:{section_id}:{ref_type}:{locator}",
-                "reference_type": ref_type,
-                "target_locator": locator,
-                "from_section_id": section_id,
-                "doc_id": doc_id,
-                "reason": _infer_reference_reason(window),
-            })
+        # ---- Cross-section references ----
+        lo, hi = max(0, start - 60), min(len(text), end + 60)
+        window = text_lower[lo:hi] if aligned else text[lo:hi].lower()
+        if not any(k in window for k in REFERENCE_CUES):
+            continue
+
+        reference_id = f"{doc_id}:{section_id}:{kind}:{locator}"
+        if reference_id in seen_refs:
+            continue
+        seen_refs.add(reference_id)
+
+        references.append({
+            "reference_id": reference_id,
+            "reference_type": kind,
+            "target_locator": locator,
+            "from_section_id": section_id,
+            "doc_id": doc_id,
+            "reason": _infer_reference_reason(window),
+        })
+
+    return {
+        "references": references,
+        "tables": tables,
+        "figures": figures,
+    }
 
-    return _deduplicate_references(references)
+
+# -----------------------------
+# Cross-section references
+# -----------------------------
+
+def extract_cross_section_references(
+    text: str,
+    section_id: str,
+    doc_id: str,
+) -> List[Dict[str, Any]]:
+    """
+    Extract high-confidence cross-section references using regex + heuristics.
+    """
+    return scan_section(text, section_id, doc_id)["references"]
 
 
 def _infer_reference_reason(context: str) -> str:
@@ -66,21 +172,6 @@ def _infer_reference_reason(context: str) -> str:
     return "REFERENCED_IN"
 
 
-def _deduplicate_references(
-    references: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    seen = set()
-    unique = []
-
-    for ref in references:
-        key = ref["reference_id"]
-        if key not in seen:
-            seen.add(key)
-            unique.append(ref)
-
-    return unique
-
-
 # -----------------------------
 # Tables & figures (mentions only)
 # -----------------------------
@@ -93,48 +184,41 @@ def extract_tables_and_figures(
     """
     Detect table and figure mentions only.
     """
+    scan = scan_section(text, section_id, doc_id)
+    return scan["tables"], scan["figures"]
 
-    tables = []
-    figures = []
-
-    for match in re.finditer(r'\btable\s+(\d+(?:\.\d+)*)\b', text, re.IGNORECASE):
-        table_id = match.group(1)
-        tables.append({
-            "table_id": f"{doc_id}:table:{table_id}",
-            "label": table_id,
-            "section_id": section_id,
-            "doc_id": doc_id,
-        })
 
-    for match in re.finditer(
-        r'\b(?:fig(?:ure)?\.?)\s*(\d+(?:\.\d+)*)\b',
-        text,
-        re.IGNORECASE
-    ):
-        fig_id = match.group(1)
-        figures.append({
-            "figure_id": f"{doc_id}:figure:{fig_id}",
-            "label": fig_id,
-            "section_id": section_id,
-            "doc_id": doc_id,
-        })
-
-    return (
-        _deduplicate_by_key(tables, "table_id"),
-        _deduplicate_by_key(figures, "figure_id"),
-    )
-
-
-def _deduplicate_by_key(
-    items: List[Dict[str, Any]],
-    key: str
-) -> List[Dict[str, Any]]:
-    seen = set()
-    result = []
-
-    for item in items:
-        if item[key] not in seen:
-            seen.add(item[key])
-            result.append(item)
+# -----------------------------
+# Persistence (SEPARATE STEP)
+# -----------------------------
 
-    return result
+def extract_and_persist_references(
+    neo4j,
+    sections: List[Dict[str, Any]],
+    doc_id: str,
+    session=None,
+) -> Dict[str, int]:
+    """
+    Scan every section, then ONE UNWIND per node type
+    (references, tables, figures) on one session.
+    """
+    references: List[Dict[str, Any]] = []
+    tables: List[Dict[str, Any]] = []
+    figures: List[Dict[str, Any]] = []
+
+    for section in sections:
+        text = section.get("text", "")
+        if not text:
+            continue
+
+        scan = scan_section(text, section["section_id"], doc_id)
+        references.extend(scan["references"])
+        tables.extend(scan["tables"])
+        figures.extend(scan["figures"])
+
+    with neo4j.session_scope(session) as session:
+        return {
+            "references": neo4j.create_references_batch(references, doc_id=doc_id, session=session),
+            "tables": neo4j.create_tables_batch(tables, doc_id=doc_id, session=session),
+            "figures": neo4j.create_figures_batch(figures, doc_id=doc_id, session=session),
+        }
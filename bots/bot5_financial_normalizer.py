@@ -8,23 +8,33 @@ NO LLMs.
 
 import json
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator
 from database.neo4j_client import Neo4jClient
 
 
 CONCEPT_PATH = Path("config/financial_concepts.json")
 
+READ_FETCH_SIZE = 1000      # records per Bolt pull while streaming names
+WRITE_BATCH_SIZE = 5000     # UNWIND rows per write transaction
+
 
 # --------------------------------------------------
 # Registry
 # --------------------------------------------------
 
+@lru_cache(maxsize=1)
 def load_financial_concepts() -> Dict[str, Dict[str, Any]]:
+    """
+    Parsed registry, loaded once per process.
+    """
     with open(CONCEPT_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+@lru_cache(maxsize=8192)
 def _normalize_key(text: str) -> str:
     """
     Normalize entity text for alias matching.
@@ -35,68 +45,95 @@ def _normalize_key(text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=1)
+def load_alias_map() -> Dict[str, str]:
+    """
+    Normalized alias → canonical concept, built once per process.
+    """
+    alias_map = {}
+    for concept, meta in load_financial_concepts().items():
+        for alias in meta.get("aliases", []):
+            alias_map[_normalize_key(alias)] = concept
+    return alias_map
+
+
 # --------------------------------------------------
 # Normalization
 # --------------------------------------------------
 
+def _iter_alias_matches(names: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    Yield UNWIND rows {name, concept, category} for names with a known alias.
+    Whole-name match → hash lookup; an automaton only pays off for
+    substring matching inside free text.
+    """
+    concepts = load_financial_concepts()
+    alias_map = load_alias_map()
+
+    for entity_name in names:
+        canonical = alias_map.get(_normalize_key(entity_name))
+        if canonical:
+            yield {
+                "name": entity_name,
+                "concept": canonical,
+                "category": concepts[canonical].get("category", "OTHER"),
+            }
+
+
 def normalize_financial_entities(
     neo4j: Neo4jClient,
-    doc_id: str = "doc-1"
+    doc_id: str = "doc-1",
+    session=None,
 ) -> Dict[str, Any]:
     """
     Normalize Entity nodes to global FinancialConcept nodes.
+    `session` (optional) is used for the writes; reads always stream
+    on their own session.
     """
 
-    concepts = load_financial_concepts()
-
-    # Build alias → canonical concept map
-    alias_map = {}
-    for concept, meta in concepts.items():
-        for alias in meta.get("aliases", []):
-            alias_map[_normalize_key(alias)] = concept
-
-    concepts_created = 0
+    new_concepts = set()
     links_created = 0
 
-    with neo4j.driver.session() as session:
+    # Reader streams names (fetch_size) while the writer commits
+    # bounded UNWIND batches on its own session.
+    with neo4j.session(fetch_size=READ_FETCH_SIZE) as read_session, \
+            neo4j.session_scope(session) as write_session:
 
-        entities = session.run("""
+        names = read_session.run("""
             MATCH (e:Entity {doc_id: $doc_id})
             RETURN e.name AS name
         """, doc_id=doc_id)
 
-        for record in entities:
-            entity_name = record["name"]
-            key = _normalize_key(entity_name)
-
-            canonical = alias_map.get(key)
-            if not canonical:
-                continue
-
-            category = concepts[canonical].get("category", "OTHER")
-
-            # Create or match FinancialConcept (GLOBAL)
-            result = session.run("""
-                MERGE (fc:FinancialConcept {name: $name})
-                ON CREATE SET
-                    fc.category = $category,
-                    fc.source = 'financial_concepts.json'
-                RETURN fc
-            """, name=canonical, category=category).single()
-
-            if result and result["fc"].get("source") == "financial_concepts.json":
-                concepts_created += 1
-
-            # Link Entity → FinancialConcept (idempotent)
-            link = session.run("""
-                MATCH (e:Entity {doc_id: $doc_id, name: $entity_name})
-                MATCH (fc:FinancialConcept {name: $concept_name})
-                MERGE (e)-[r:NORMALIZED_TO]->(fc)
-                RETURN r
-            """, doc_id=doc_id, entity_name=entity_name, concept_name=canonical).single()
-
-            if link:
-                links_created += 1
+        matches = _iter_alias_matches(record["name"] for record in names)
+
+        while True:
+            batch = list(islice(matches, WRITE_BATCH_SIZE))
+            if not batch:
+                break
+
+            with write_session.begin_transaction() as tx:
+                # Create/match FinancialConcept (GLOBAL) + link Entity (idempotent)
+                summary = tx.run("""
+                    UNWIND $rows AS row
+                    MERGE (fc:FinancialConcept {name: row.concept})
+                    ON CREATE SET
+                        fc.category = row.category,
+                        fc.source = 'financial_concepts.json'
+                    WITH fc, row
+                    MATCH (e:Entity {doc_id: $doc_id, name: row.name})
+                    MERGE (e)-[r:NORMALIZED_TO]->(fc)
+                    RETURN
+                        collect(DISTINCT CASE
+                            WHEN fc.source = 'financial_concepts.json' THEN fc.name
+                        END) AS concepts,
+                        count(r) AS links
+                """, rows=batch, doc_id=doc_id).single()
+                tx.commit()
+
+            new_concepts.update(summary["concepts"])
+            links_created += summary["links"]
+
+    concepts_created = len(new_concepts)
 
     print("✅ Financial normalization complete")
     print(f"   New concepts created: {concepts_created}")
@@ -7,7 +7,9 @@ PURE text -> structured signals.
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
+
+from utils.pattern_scan import compile_hyperscan, hyperscan_finditer
 
 
 # --------------------------------------------------
@@ -35,113 +37,222 @@ CALENDAR_CONTEXT = (
     "year", "fy", "fiscal", "quarter", "results", "revenue", "income"
 )
 
+CALENDAR_YEAR_PATTERN = r'\b(?:19\d{2}|20\d{2})\b'
+
+
+# --------------------------------------------------
+# Single-scan union (compiled ONCE)
+# --------------------------------------------------
+# Every alternative sits inside a zero-width lookahead, so the scan still
+# tries ALL patterns at EVERY position: overlapping hits such as
+# "Q1 FY2024" (quarter) + "FY2024" (annual) are kept, exactly as with
+# one finditer per pattern. No two alternatives can match at the same
+# position, so the first matching alternative is the only one.
+
+_TIME_RE = re.compile(
+    "(?="
+    + "|".join(
+        f"(?P<t{i}>{pattern})" for i, (pattern, _, _) in enumerate(TIME_PATTERNS)
+    )
+    + f"|(?P<cal>{CALENDAR_YEAR_PATTERN})"
+    + ")",
+    re.IGNORECASE,
+)
+
+# Per-pattern regexes: Hyperscan re-match step + group counts below.
+# Pattern index len(TIME_PATTERNS) is the calendar-year pattern.
+_CALENDAR = len(TIME_PATTERNS)
+_TIME_REGEXES = [
+    re.compile(pattern, re.IGNORECASE) for pattern, _, _ in TIME_PATTERNS
+] + [re.compile(CALENDAR_YEAR_PATTERN)]
+
+# group name → (label_fn, period_type, first inner group, inner group count)
+_TIME_GROUPS = {
+    f"t{i}": (
+        label_fn,
+        ptype,
+        _TIME_RE.groupindex[f"t{i}"] + 1,
+        _TIME_REGEXES[i].groups,
+    )
+    for i, (pattern, label_fn, ptype) in enumerate(TIME_PATTERNS)
+}
+
+# Optional Hyperscan DFA (None → use _TIME_RE)
+_TIME_HS_DB = compile_hyperscan(
+    [pattern for pattern, _, _ in TIME_PATTERNS] + [CALENDAR_YEAR_PATTERN]
+)
+
+
+def _iter_time_matches(text: str) -> Iterator[Tuple[int, list, int, int]]:
+    """
+    Yield (pattern_index, groups, start, end) for every pattern hit.
+    Calendar hits carry the year as their only group.
+    """
+    if _TIME_HS_DB is not None:
+        for idx, m in hyperscan_finditer(_TIME_HS_DB, _TIME_REGEXES, text):
+            groups = [m.group(0)] if idx == _CALENDAR else list(m.groups())
+            yield idx, groups, m.start(), m.end()
+        return
+
+    for m in _TIME_RE.finditer(text):
+        name = m.lastgroup
+
+        if name == "cal":
+            start, end = m.span("cal")
+            yield _CALENDAR, [m.group("cal")], start, end
+            continue
+
+        idx = int(name[1:])
+        _, _, first, count = _TIME_GROUPS[name]
+        yield idx, [m.group(g) for g in range(first, first + count)], m.start(name), m.end(name)
+
 
 # --------------------------------------------------
 # Extraction
 # --------------------------------------------------
 
+_TYPE_ORDER = {"ANNUAL": 0, "HALF": 1, "QUARTER": 2, "CALENDAR": 3}
+
+
 def extract_timeperiods(text: str) -> List[Dict[str, Any]]:
     """
     Extract unique, high-confidence time periods from text.
     """
-    periods = []
+    # label → period (first occurrence wins; dedup on insert)
+    periods: Dict[str, Dict[str, Any]] = {}
 
-    # ---- Pattern-based extraction ----
-    for pattern, label_fn, ptype in TIME_PATTERNS:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            groups = match.groups()
-            label = label_fn(*groups)
-            year = int(groups[-1])
+    for idx, groups, start, end in _iter_time_matches(text):
 
+        # ---- Contextual calendar year extraction ----
+        if idx == _CALENDAR:
+            year = int(groups[0])
             if year < 1990 or year > 2050:
                 continue
 
-            periods.append({
-                "label": label,
-                "year": year,
-                "period_type": ptype,
-            })
-
-    # ---- Contextual calendar year extraction ----
-    for match in re.finditer(r'\b(19\d{2}|20\d{2})\b', text):
-        year = int(match.group(1))
-        if year < 1990 or year > 2050:
-            continue
+            window = text[max(0, start - 30): end + 30].lower()
+            if not any(k in window for k in CALENDAR_CONTEXT):
+                continue
 
-        window = text[max(0, match.start() - 30): match.end() + 30].lower()
-        if not any(k in window for k in CALENDAR_CONTEXT):
+            label = f"CY{year}"
+            if label not in periods:
+                periods[label] = {
+                    "label": label,
+                    "year": year,
+                    "period_type": "CALENDAR",
+                }
             continue
 
-        periods.append({
-            "label": f"CY{year}",
-            "year": year,
-            "period_type": "CALENDAR",
-        })
+        # ---- Pattern-based extraction ----
+        _, label_fn, ptype = TIME_PATTERNS[idx]
+        label = label_fn(*groups)
+        year = int(groups[-1])
 
-    # ---- Deduplicate by label ----
-    seen = set()
-    unique = []
-    for p in periods:
-        if p["label"] not in seen:
-            seen.add(p["label"])
-            unique.append(p)
+        if year < 1990 or year > 2050:
+            continue
 
-    # ---- Sort ----
-    type_order = {"ANNUAL": 0, "HALF": 1, "QUARTER": 2, "CALENDAR": 3}
-    unique.sort(key=lambda x: (x["year"], type_order.get(x["period_type"], 99)))
+        if label not in periods:
+            periods[label] = {
+                "label": label,
+                "year": year,
+                "period_type": ptype,
+            }
 
-    return unique
+    # ---- Sort (stable → first-seen order within ties) ----
+    return sorted(
+        periods.values(),
+        key=lambda x: (x["year"], _TYPE_ORDER.get(x["period_type"], 99)),
+    )
 
 
 # --------------------------------------------------
 # Persistence (SEPARATE STEP)
 # --------------------------------------------------
 
+def collect_timeperiods(
+    section_id: str,
+    text: str,
+    periods: Dict[str, Dict[str, Any]],
+    links: List[Dict[str, str]],
+) -> None:
+    """
+    Accumulate one section's period rows (deduped by label) and
+    APPLIES_TO links — lets callers fold Bot 6 into their own
+    per-section loop, then call write_timeperiods() once.
+    """
+    if not text:
+        return
+
+    for p in extract_timeperiods(text):
+        label = p["label"]
+        # Membership test first: setdefault would build the row dict
+        # for every repeat of a period across sections
+        if label not in periods:
+            periods[label] = {
+                "label": label,
+                "year": p["year"],
+                "ptype": p["period_type"],
+            }
+        links.append({"section_id": section_id, "label": label})
+
+
 def persist_timeperiods(
     neo4j,
     sections: List[Dict[str, Any]],
     doc_id: str,
+    session=None,
 ) -> Dict[str, int]:
     """
     Persist extracted TimePeriods and link to sections.
     """
 
+    # Accumulate across ALL sections → two UNWIND writes per document
+    periods: Dict[str, Dict[str, Any]] = {}
+    links: List[Dict[str, str]] = []
+
+    for section in sections:
+        collect_timeperiods(section["section_id"], section.get("text", ""), periods, links)
+
+    return write_timeperiods(neo4j, periods, links, doc_id, session=session)
+
+
+def write_timeperiods(
+    neo4j,
+    periods: Dict[str, Dict[str, Any]],
+    links: List[Dict[str, str]],
+    doc_id: str,
+    session=None,
+) -> Dict[str, int]:
+    """
+    Two UNWIND writes: GLOBAL TimePeriod nodes, then APPLIES_TO links.
+    """
     periods_created = 0
     links_created = 0
 
-    with neo4j.driver.session() as session:
-        for section in sections:
-            section_id = section["section_id"]
-            text = section.get("text", "")
+    if not periods:
+        return {
+            "periods_created": periods_created,
+            "section_links": links_created,
+        }
 
-            if not text:
-                continue
+    with neo4j.session_scope(session) as session:
+        # GLOBAL TimePeriod nodes
+        periods_created = session.run("""
+            UNWIND $periods AS p
+            MERGE (t:TimePeriod {label: p.label})
+            ON CREATE SET
+                t.year = p.year,
+                t.period_type = p.ptype,
+                t.scope = 'global'
+            RETURN count(t) AS n
+        """, periods=list(periods.values())).single()["n"]
 
-            periods = extract_timeperiods(text)
-
-            for p in periods:
-                # GLOBAL TimePeriod node
-                result = session.run("""
-                    MERGE (t:TimePeriod {label: $label})
-                    ON CREATE SET
-                        t.year = $year,
-                        t.period_type = $ptype,
-                        t.scope = 'global'
-                    RETURN t
-                """, label=p["label"], year=p["year"], ptype=p["period_type"]).single()
-
-                if result:
-                    periods_created += 1
-
-                link = session.run("""
-                    MATCH (s:Section {doc_id: $doc_id, section_id: $section_id})
-                    MATCH (t:TimePeriod {label: $label})
-                    MERGE (s)-[r:APPLIES_TO]->(t)
-                    RETURN r
-                """, doc_id=doc_id, section_id=section_id, label=p["label"]).single()
-
-                if link:
-                    links_created += 1
+        links_created = session.run("""
+            UNWIND $links AS l
+            MATCH (s:Section {doc_id: $doc_id, section_id: l.section_id})
+            MATCH (t:TimePeriod {label: l.label})
+            MERGE (s)-[r:APPLIES_TO]->(t)
+            RETURN count(r) AS n
+        """, links=links, doc_id=doc_id).single()["n"]
 
     return {
         "periods_created": periods_created,
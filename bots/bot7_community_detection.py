@@ -12,8 +12,8 @@ Graph-only logic
 """
 
 import networkx as nx
-import community.community_louvain as community_louvain
-from typing import Dict, Any, List
+from networkx.algorithms.community import louvain_communities, modularity as nx_modularity
+from typing import Dict, Any, List, Tuple
 
 from database.neo4j_client import Neo4jClient
 
@@ -29,65 +29,75 @@ def get_section_graph(neo4j: Neo4jClient, doc_id: str) -> nx.Graph:
     2. Shared CORE / IMPORTANT entities (soft signal)
     """
 
+    # Nodes + both edge kinds in ONE round-trip
+    with neo4j.session() as session:
+        record = session.run("""
+            MATCH (s:Section {doc_id: $doc_id})
+            WITH collect({id: s.section_id, title: s.title}) AS sections
+
+            // Explicit references (strong)
+            CALL {
+                MATCH (s1:Section {doc_id: $doc_id})
+                      -[:REFERS_TO]->(:Reference)
+                      -[:POINTS_TO]->(s2:Section {doc_id: $doc_id})
+                RETURN collect({src: s1.section_id, tgt: s2.section_id}) AS refs
+            }
+
+            // Shared salient entities (soft)
+            CALL {
+                MATCH (s1:Section {doc_id: $doc_id})
+                      -[:MENTIONS]->(e:Entity)
+                      <-[:MENTIONS]-(s2:Section {doc_id: $doc_id})
+                WHERE e.salience IN ['CORE', 'IMPORTANT']
+                  AND s1.section_id < s2.section_id
+                WITH s1, s2, count(DISTINCT e) AS shared
+                RETURN collect({
+                    src: s1.section_id,
+                    tgt: s2.section_id,
+                    shared: shared
+                }) AS shared
+            }
+
+            RETURN sections, refs, shared
+        """, doc_id=doc_id).single()
+
     G = nx.Graph()
 
-    with neo4j.driver.session() as session:
+    G.add_nodes_from(
+        (r["id"], {"title": r["title"]}) for r in record["sections"]
+    )
 
-        # ------------------
-        # Sections
-        # ------------------
-        sections = session.run("""
-            MATCH (s:Section {doc_id: $doc_id})
-            RETURN s.section_id AS id, s.title AS title
-        """, doc_id=doc_id)
-
-        for r in sections:
-            G.add_node(r["id"], title=r["title"])
-
-        # ------------------
-        # Explicit references (strong)
-        # ------------------
-        refs = session.run("""
-            MATCH (s1:Section {doc_id: $doc_id})
-                  -[:REFERS_TO]->(:Reference)
-                  -[:POINTS_TO]->(s2:Section {doc_id: $doc_id})
-            RETURN s1.section_id AS src, s2.section_id AS tgt
-        """, doc_id=doc_id)
-
-        for r in refs:
-            G.add_edge(
-                r["src"],
-                r["tgt"],
-                weight=3.0,
-                source="reference"
-            )
-
-        # ------------------
-        # Shared salient entities (soft)
-        # ------------------
-        shared = session.run("""
-            MATCH (s1:Section {doc_id: $doc_id})
-                  -[:MENTIONS]->(e:Entity)
-                  <-[:MENTIONS]-(s2:Section {doc_id: $doc_id})
-            WHERE e.salience IN ['CORE', 'IMPORTANT']
-              AND s1.section_id < s2.section_id
-            RETURN s1.section_id AS src,
-                   s2.section_id AS tgt,
-                   count(DISTINCT e) AS shared
-        """, doc_id=doc_id)
-
-        for r in shared:
-            if r["shared"] >= 1:
-                G.add_edge(
-                    r["src"],
-                    r["tgt"],
-                    weight=1.0 + min(r["shared"], 3),
-                    source="entity"
-                )
+    G.add_edges_from(
+        (r["src"], r["tgt"], {"weight": 3.0, "source": "reference"})
+        for r in record["refs"]
+    )
+
+    # Added after references → overrides a reference edge on the same pair
+    G.add_edges_from(
+        (r["src"], r["tgt"], {"weight": 1.0 + min(r["shared"], 3), "source": "entity"})
+        for r in record["shared"]
+        if r["shared"] >= 1
+    )
 
     return G
 
 
+# ==================================================
+# Louvain
+# ==================================================
+
+def _louvain(G: nx.Graph) -> Tuple[Dict[int, List[str]], float]:
+    """
+    NetworkX Louvain → ({community_id: [section_id, ...]}, modularity).
+    Seeded so repeated runs give the same communities.
+    """
+    parts = louvain_communities(G, weight="weight", seed=0)
+    modularity = nx_modularity(G, parts, weight="weight")
+
+    communities = {cid: list(part) for cid, part in enumerate(parts)}
+    return communities, modularity
+
+
 # ==================================================
 # Community Persistence
 # ==================================================
@@ -103,35 +113,33 @@ def _persist_communities(
     Persist communities and section memberships.
     """
 
-    with neo4j.driver.session() as session:
-        for cid, sections in communities.items():
-
-            session.run("""
-                MERGE (c:Community {
-                    community_id: $cid,
-                    doc_id: $doc_id
-                })
-                SET c.size = $size,
-                    c.modularity = $modularity,
-                    c.mode = $mode
-            """, cid=str(cid),
-                 doc_id=doc_id,
-                 size=len(sections),
-                 modularity=modularity,
-                 mode=mode)
-
-            for sid in sections:
-                session.run("""
-                    MATCH (s:Section {
-                        doc_id: $doc_id,
-                        section_id: $sid
-                    })
-                    MATCH (c:Community {
-                        doc_id: $doc_id,
-                        community_id: $cid
-                    })
-                    MERGE (c)-[:CONTAINS]->(s)
-                """, doc_id=doc_id, sid=sid, cid=str(cid))
+    rows = [
+        {"cid": str(cid), "size": len(sections), "sections": sections}
+        for cid, sections in communities.items()
+    ]
+
+    # Communities + memberships in ONE round-trip
+    with neo4j.session() as session:
+        session.run("""
+            UNWIND $rows AS row
+            MERGE (c:Community {
+                community_id: row.cid,
+                doc_id: $doc_id
+            })
+            SET c.size = row.size,
+                c.modularity = $modularity,
+                c.mode = $mode
+            WITH c, row
+            UNWIND row.sections AS sid
+            MATCH (s:Section {
+                doc_id: $doc_id,
+                section_id: sid
+            })
+            MERGE (c)-[:CONTAINS]->(s)
+        """, rows=rows,
+             doc_id=doc_id,
+             modularity=modularity,
+             mode=mode)
 
     print(f"✅ Communities persisted ({mode} mode)")
 
@@ -182,14 +190,7 @@ def detect_section_communities(
             communities = {0: list(G.nodes())}
             modularity = 0.0
         else:
-            partition = community_louvain.best_partition(G, weight="weight")
-            modularity = community_louvain.modularity(
-                partition, G, weight="weight"
-            )
-
-            communities: Dict[int, List[str]] = {}
-            for sid, cid in partition.items():
-                communities.setdefault(cid, []).append(sid)
+            communities, modularity = _louvain(G)
 
         return _persist_communities(
             neo4j,
@@ -211,8 +212,7 @@ def detect_section_communities(
             "edges": n_edges,
         }
 
-    partition = community_louvain.best_partition(G, weight="weight")
-    modularity = community_louvain.modularity(partition, G, weight="weight")
+    communities, modularity = _louvain(G)
 
     print(f"📐 Modularity: {modularity:.3f}")
 
@@ -223,10 +223,6 @@ def detect_section_communities(
             "modularity": modularity,
         }
 
-    communities: Dict[int, List[str]] = {}
-    for sid, cid in partition.items():
-        communities.setdefault(cid, []).append(sid)
-
     # Remove singleton communities
     communities = {
         cid: secs
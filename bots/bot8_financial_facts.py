@@ -10,7 +10,9 @@ Table-first, deterministic financial fact extraction.
 """
 
 import json
-from typing import List, Dict, Any
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 from openai import OpenAI
 from groq import Groq
@@ -42,6 +44,7 @@ CANONICAL_METRICS = {
 }
 
 
+@lru_cache(maxsize=8192)
 def classify_metric(label: str) -> str:
     label_l = label.lower()
     for k, v in CANONICAL_METRICS.items():
@@ -54,6 +57,10 @@ def classify_metric(label: str) -> str:
 # Helpers
 # ==================================================
 
+_SCOPES = frozenset(("GROUP", "COMPANY"))
+
+
+@lru_cache(maxsize=1024)
 def parse_column(col: str):
     """
     Group_2024 → ("GROUP", "2024")
@@ -66,21 +73,51 @@ def parse_column(col: str):
     if not year.isdigit():
         return None, None
 
-    if scope.upper() not in {"GROUP", "COMPANY"}:
+    scope = scope.upper()
+    if scope not in _SCOPES:
         return None, None
 
-    return scope.upper(), year
+    return scope, year
+
+
+@lru_cache(maxsize=256)
+def column_schema(columns: Tuple[str, ...]) -> Tuple[Tuple[str, str, str, str], ...]:
+    """
+    Header row → ((column, lowered column, scope, year), ...) for the
+    scoped year columns. Statements reuse the same headers, so whole
+    schemas are cached, not just single columns.
+    """
+    return tuple(
+        (col, col.lower(), scope, year)
+        for col, (scope, year) in zip(columns, map(parse_column, columns))
+        if scope and year
+    )
+
+
+# Plain decimal with optional sign / thousands separators: 1,234.5  -12  .5
+_NUM_RE = re.compile(r"^[-+]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)$")
+
+
+# Empty table cells. A tuple, not a frozenset: cells may be unhashable
+_BLANK_CELLS = (None, "", "-")
 
 
 def normalize_number(value):
-    if value in (None, "", "-"):
-        return None
-    try:
-        return float(str(value).replace(",", ""))
-    except Exception:
+    """
+    Table cell → float, or None for blanks, dashes and footnote markers.
+    """
+    if value in _BLANK_CELLS:
         return None
+    if isinstance(value, (int, float)):
+        return float(value)
 
+    s = value.strip() if isinstance(value, str) else str(value).strip()
+    if _NUM_RE.match(s):
+        return float(s.replace(",", ""))
+    return None
 
+
+@lru_cache(maxsize=1024)
 def infer_scale(currency: str) -> str:
     """
     Rs.'000 → THOUSANDS
@@ -103,15 +140,18 @@ def infer_scale(currency: str) -> str:
 # TABLE EXTRACTION (PRIMARY)
 # ==================================================
 
-def extract_facts_from_tables(
+def collect_facts_from_tables(
     section: Dict[str, Any],
-    doc_id: str,
-    neo4j: Neo4jClient,
-) -> int:
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Pure pass over a section's tables → (metric names, fact rows).
+    Fact rows match Neo4jClient.create_financial_facts_batch.
+    """
 
     section_id = section["section_id"]
     tables = section.get("tables", [])
-    created = 0
+    metrics: Dict[str, None] = {}      # ordered set
+    facts: List[Dict[str, Any]] = []
 
     for table in tables:
         if table.get("type") != "financial_statement":
@@ -123,16 +163,14 @@ def extract_facts_from_tables(
         columns = table.get("columns", [])
         rows = table.get("rows", [])
 
-        # Parse columns → scope + year
-        col_meta = {}
-        for col in columns:
-            scope, year = parse_column(col)
-            if scope and year:
-                col_meta[col.lower()] = (scope, year)
+        # Parsed once per distinct header row (cached)
+        col_meta = column_schema(tuple(columns))
 
         if not col_meta:
             continue
 
+        # Classify each row ONCE
+        metric_rows = []
         for row in rows:
             label = row.get("item")
             if not label:
@@ -142,41 +180,78 @@ def extract_facts_from_tables(
             if base_metric == "Other":
                 continue
 
-            # Ensure entity exists
-            neo4j.create_entity(
-                name=base_metric,
-                entity_type="FINANCIAL",
-                description=f"Financial metric: {base_metric}",
-                salience="CORE",
-            )
-
-            neo4j.link_entity_to_section(
-                entity_name=base_metric,
-                section_id=section_id,
-                doc_id=doc_id,
-            )
-
-            for col_key, (scope, year) in col_meta.items():
+            metric_rows.append((base_metric, row))
+            metrics[base_metric] = None
+
+        # Column-outer / row-inner: one column's values at a time
+        for col, col_key, scope, year in col_meta:
+            for base_metric, row in metric_rows:
+                # Rows may be keyed by the lowered or the original header
                 raw_val = row.get(col_key)
+                if raw_val is None:
+                    raw_val = row.get(col)
+                # Blank cells never reach normalize_number
+                if raw_val in _BLANK_CELLS:
+                    continue
                 value = normalize_number(raw_val)
                 if value is None:
                     continue
 
-                # 👇 EXACT Neo4jClient signature
-                neo4j.create_financial_fact(
-                    metric=base_metric,
-                    value=value,
-                    unit=currency,
-                    scale=scale,
-                    period_type="YEAR",
-                    period_value=year,
-                    confidence="HIGH",
-                    doc_id=doc_id,
-                )
+                facts.append({
+                    "metric": base_metric,
+                    "value": value,
+                    "unit": currency,
+                    "scale": scale,
+                    "period_type": "YEAR",
+                    "period_value": year,
+                    "confidence": "HIGH",
+                    "section_id": section_id,
+                })
+
+    return list(metrics), facts
+
+
+def _persist_metric_entities(
+    neo4j: Neo4jClient,
+    metrics: List[str],
+    section_id: str,
+    doc_id: str,
+    session=None,
+) -> None:
+    """
+    Ensure metric entities exist and are linked to their section.
+    """
+    neo4j.create_entities_batch(
+        [
+            {
+                "name": metric,
+                "type": "FINANCIAL",
+                "description": f"Financial metric: {metric}",
+                "salience": "CORE",
+            }
+            for metric in metrics
+        ],
+        section_id=section_id,
+        doc_id=doc_id,
+        session=session,
+    )
 
-                created += 1
 
-    return created
+def extract_facts_from_tables(
+    section: Dict[str, Any],
+    doc_id: str,
+    neo4j: Neo4jClient,
+    session=None,
+) -> int:
+
+    metrics, facts = collect_facts_from_tables(section)
+
+    _persist_metric_entities(
+        neo4j, metrics, section["section_id"], doc_id, session=session
+    )
+    neo4j.create_financial_facts_batch(facts, doc_id=doc_id, session=session)
+
+    return len(facts)
 
 
 # ==================================================
@@ -187,9 +262,10 @@ def extract_financial_facts_from_section(
     section: Dict[str, Any],
     doc_id: str,
     neo4j: Neo4jClient,
+    session=None,
 ) -> Dict[str, int]:
 
-    facts = extract_facts_from_tables(section, doc_id, neo4j)
+    facts = extract_facts_from_tables(section, doc_id, neo4j, session=session)
     return {"facts_created": facts}
 
 
@@ -201,13 +277,26 @@ def extract_financial_facts_from_document(
     sections: List[Dict[str, Any]],
     doc_id: str,
     neo4j: Neo4jClient,
+    session=None,
 ) -> Dict[str, int]:
 
-    total = 0
-    for section in sections:
-        total += extract_financial_facts_from_section(
-            section, doc_id, neo4j
-        )["facts_created"]
+    # Facts for the WHOLE document go out in batched UNWIND writes
+    all_facts: List[Dict[str, Any]] = []
+
+    # ONE session for the whole document (the caller's, if given);
+    # each section's metrics commit in their own managed transaction,
+    # facts go through the auto-commit CALL IN TRANSACTIONS batch
+    with neo4j.session_scope(session) as session:
+        for section in sections:
+            metrics, facts = collect_facts_from_tables(section)
+            if metrics:
+                _persist_metric_entities(
+                    neo4j, metrics, section["section_id"], doc_id, session=session
+                )
+            all_facts.extend(facts)
+
+        neo4j.create_financial_facts_batch(all_facts, doc_id=doc_id, session=session)
 
+    total = len(all_facts)
     print(f"[Bot 8] Financial facts created: {total}")
     return {"facts_created": total}
@@ -11,7 +11,9 @@ Table-first financial fact extraction.
 """
 
 import json
-from typing import List, Dict, Any
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 from database.neo4j_client import Neo4jClient
 
@@ -30,6 +32,7 @@ CANONICAL_METRICS = {
 }
 
 
+@lru_cache(maxsize=8192)
 def classify_metric(label: str) -> str:
     label_l = label.lower()
     for k, v in CANONICAL_METRICS.items():
@@ -42,6 +45,10 @@ def classify_metric(label: str) -> str:
 # Column parser
 # ==================================================
 
+_SCOPES = frozenset(("GROUP", "COMPANY"))
+
+
+@lru_cache(maxsize=1024)
 def parse_column(col: str):
     """
     Group_2024 → ("GROUP", "2024")
@@ -55,19 +62,47 @@ def parse_column(col: str):
         return None, None
 
     scope = scope.upper()
-    if scope not in {"GROUP", "COMPANY"}:
+    if scope not in _SCOPES:
         return None, None
 
     return scope, year
 
 
+@lru_cache(maxsize=256)
+def column_schema(columns: Tuple[str, ...]) -> Tuple[Tuple[str, str, str, str], ...]:
+    """
+    Header row → ((column, lowered column, scope, year), ...) for the
+    scoped year columns. Statements reuse the same headers, so whole
+    schemas are cached, not just single columns.
+    """
+    return tuple(
+        (col, col.lower(), scope, year)
+        for col, (scope, year) in zip(columns, map(parse_column, columns))
+        if scope and year
+    )
+
+
+# Plain decimal with optional sign / thousands separators: 1,234.5  -12  .5
+_NUM_RE = re.compile(r"^[-+]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)$")
+
+
+# Empty table cells. A tuple, not a frozenset: cells may be unhashable
+_BLANK_CELLS = (None, "", "-")
+
+
 def normalize_number(value):
-    if value in (None, "-", ""):
-        return None
-    try:
-        return float(str(value).replace(",", ""))
-    except Exception:
+    """
+    Table cell → float, or None for blanks, dashes and footnote markers.
+    """
+    if value in _BLANK_CELLS:
         return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    s = value.strip() if isinstance(value, str) else str(value).strip()
+    if _NUM_RE.match(s):
+        return float(s.replace(",", ""))
+    return None
 
 
 # ==================================================
@@ -83,6 +118,7 @@ def extract_facts_from_tables(
     section_id = section["section_id"]
     tables = section.get("tables", [])
     created = 0
+    seen_metrics: Dict[str, None] = {}     # ordered set, per section
 
     for table in tables:
         if table.get("type") != "financial_statement":
@@ -92,16 +128,14 @@ def extract_facts_from_tables(
         columns = table.get("columns", [])
         rows = table.get("rows", [])
 
-        # ---- parse column metadata ----
-        col_meta = {}
-        for col in columns:
-            scope, year = parse_column(col)
-            if scope and year:
-                col_meta[col.lower()] = (scope, year)
+        # ---- column metadata (cached per header row) ----
+        col_meta = column_schema(tuple(columns))
 
         if not col_meta:
             continue
 
+        # ---- classify each row once ----
+        metric_rows = []
         for row in rows:
             label = row.get("item")
             if not label:
@@ -111,34 +145,36 @@ def extract_facts_from_tables(
             if metric == "Other":
                 continue
 
-            # Ensure metric entity exists
-            neo4j.create_entity(
-                name=metric,
-                entity_type="FINANCIAL",
-                description=f"Financial metric: {metric}",
-                salience="CORE",
-            )
-
-            neo4j.link_entity_to_section(
-                entity_name=metric,
-                section_id=section_id,
-                doc_id=doc_id,
-            )
-
-            for col_key, (scope, year) in col_meta.items():
+            metric_rows.append((metric, row))
+            seen_metrics[metric] = None
+
+        # ---- column-outer / row-inner ----
+        for col, col_key, scope, year in col_meta:
+            period_desc = f"({scope}) for year {year}"   # fixed per column
+
+            for metric, row in metric_rows:
+                # Rows may be keyed by the lowered or the original header
                 raw_val = row.get(col_key)
+                if raw_val is None:
+                    raw_val = row.get(col)
+                # Blank cells never reach normalize_number
+                if raw_val in _BLANK_CELLS:
+                    continue
                 value = normalize_number(raw_val)
 
                 if value is None:
                     continue
 
-                description = f"{metric} ({scope}) for year {year}"
+                description = f"{metric} {period_desc}"
 
-                # ---- SAFE call (NO unsupported args) ----
+                # Fact + Section→Fact link in ONE statement
                 neo4j.create_financial_fact(
                     metric=metric,
                     value=value,
                     unit=currency,
+                    scale="UNIT",
+                    period_type="YEAR",
+                    period_value=year,
                     confidence="HIGH",
                     section_id=section_id,
                     doc_id=doc_id,
@@ -147,6 +183,21 @@ def extract_facts_from_tables(
 
                 created += 1
 
+    # Ensure metric entities exist: ONE UNWIND per section
+    neo4j.create_entities_batch(
+        [
+            {
+                "name": metric,
+                "type": "FINANCIAL",
+                "description": f"Financial metric: {metric}",
+                "salience": "CORE",
+            }
+            for metric in seen_metrics
+        ],
+        section_id=section_id,
+        doc_id=doc_id,
+    )
+
     return created
 
 
@@ -8,35 +8,63 @@ LLM-only summarization.
 - OpenAI PRIMARY, Groq FALLBACK
 """
 
-from typing import List, Dict, Any
-from database.neo4j_client import Neo4jClient
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
+from database.neo4j_client import Neo4jClient, READ_RUNTIME
 from config.settings import (
     OPENAI_API_KEY,
     OPENAI_LLM_MODEL,
     GROQ_API_KEY,
     GROQ_LLM_MODEL,
     MAX_COMPLETION_TOKENS,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+    LLM_MAX_CONCURRENCY,
 )
 
-from openai import OpenAI
-from groq import Groq
+from openai import OpenAI, AsyncOpenAI
+from groq import Groq, AsyncGroq
 
 
 # ==================================================
 # Lazy LLM invocation (OpenAI first)
 # ==================================================
 
+# Clients are built on first use and then reused: one httpx pool with
+# keep-alive connections instead of a new TLS handshake per summary.
+# The SDK retries 429 / 5xx with exponential backoff (MAX_RETRIES)
+# before we fall back to Groq.
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    return OpenAI(
+        api_key=OPENAI_API_KEY,
+        timeout=REQUEST_TIMEOUT,
+        max_retries=MAX_RETRIES,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_groq_client() -> Groq:
+    return Groq(
+        api_key=GROQ_API_KEY,
+        timeout=REQUEST_TIMEOUT,
+        max_retries=MAX_RETRIES,
+    )
+
+
 def chat_completion(messages, temperature=0.2, max_tokens=250):
     """
     OpenAI PRIMARY, Groq FALLBACK.
-    LLM client is created ONLY when called.
+    LLM client is created ONLY when first needed.
     """
 
     # ---- OpenAI first ----
     if OPENAI_API_KEY:
         try:
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
+            response = get_openai_client().chat.completions.create(
                 model=OPENAI_LLM_MODEL,
                 messages=messages,
                 temperature=temperature,
@@ -48,8 +76,7 @@ def chat_completion(messages, temperature=0.2, max_tokens=250):
 
     # ---- Groq fallback ----
     if GROQ_API_KEY:
-        client = Groq(api_key=GROQ_API_KEY)
-        response = client.chat.completions.create(
+        response = get_groq_client().chat.completions.create(
             model=GROQ_LLM_MODEL,
             messages=messages,
             temperature=temperature,
@@ -60,6 +87,125 @@ def chat_completion(messages, temperature=0.2, max_tokens=250):
     raise RuntimeError("❌ No LLM provider available")
 
 
+# ==================================================
+# Summary cache (prompt-content keyed)
+# ==================================================
+
+def prompt_hash(system: str, prompt: str) -> str:
+    """
+    Stable key for a prompt; stored as input_hash on summary nodes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(system.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Process-wide: input_hash → summary
+_SUMMARY_CACHE: Dict[str, str] = {}
+
+
+COMMUNITY_SYSTEM = "You summarize corporate documents precisely."
+SECTION_SYSTEM = "You summarize corporate documents accurately."
+
+
+# ==================================================
+# Concurrent LLM calls
+# ==================================================
+
+async def chat_completion_async(
+    messages,
+    aio_openai,
+    aio_groq,
+    temperature=0.2,
+    max_tokens=250,
+):
+    """Async mirror of chat_completion (OpenAI primary, Groq fallback)"""
+    if aio_openai:
+        try:
+            response = await aio_openai.chat.completions.create(
+                model=OPENAI_LLM_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"⚠️ OpenAI failed, falling back to Groq: {e}")
+
+    if aio_groq:
+        response = await aio_groq.chat.completions.create(
+            model=GROQ_LLM_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content.strip()
+
+    raise RuntimeError("❌ No LLM provider available")
+
+
+async def summarize_many(
+    jobs: List[Tuple[str, str, str]],
+    max_concurrency: int = LLM_MAX_CONCURRENCY,
+) -> Dict[str, str]:
+    """
+    jobs: [(input_hash, system, prompt)] → {input_hash: summary}
+    - Cached / duplicate prompts are sent once
+    - At most `max_concurrency` LLM calls in flight
+    - Failed calls are logged and left out of the result
+    """
+    summaries = {h: _SUMMARY_CACHE[h] for h, _, _ in jobs if h in _SUMMARY_CACHE}
+    pending = {h: (system, prompt) for h, system, prompt in jobs if h not in summaries}
+
+    if not pending:
+        return summaries
+
+    # Async clients are created per run: their HTTP pools are bound
+    # to the event loop that asyncio.run() creates.
+    aio_openai = AsyncOpenAI(
+        api_key=OPENAI_API_KEY, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES
+    ) if OPENAI_API_KEY else None
+    aio_groq = AsyncGroq(
+        api_key=GROQ_API_KEY, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES
+    ) if GROQ_API_KEY else None
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(system, prompt):
+        async with sem:
+            return await chat_completion_async(
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt},
+                ],
+                aio_openai=aio_openai,
+                aio_groq=aio_groq,
+                temperature=0.2,
+                max_tokens=MAX_COMPLETION_TOKENS,
+            )
+
+    try:
+        results = await asyncio.gather(
+            *[bounded(system, prompt) for system, prompt in pending.values()],
+            return_exceptions=True,
+        )
+    finally:
+        for client in (aio_openai, aio_groq):
+            if client is not None:
+                await client.close()
+
+    for input_hash, result in zip(pending, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Summary failed: {result}")
+            continue
+        _SUMMARY_CACHE[input_hash] = result
+        summaries[input_hash] = result
+
+    return summaries
+
+
 # ==================================================
 # Community Summarization (ON-DEMAND)
 # ==================================================
@@ -72,23 +218,28 @@ def summarize_communities(
     Generate summaries ONLY when explicitly requested.
     """
 
-    results = []
+    # ---- 1. Read: communities, titles, stored summaries ----
+    items = []
 
-    with neo4j.driver.session() as session:
-        communities = session.run("""
+    with neo4j.session() as session:
+        communities = session.run(READ_RUNTIME + """
             MATCH (c:Community {doc_id: $doc_id})
-            RETURN c.community_id AS cid, c.size AS size
-            ORDER BY c.size DESC
-        """, doc_id=doc_id)
+            OPTIONAL MATCH (c)-[:HAS_SUMMARY]->(cs:CommunitySummary)
+            RETURN c.community_id AS cid, c.size AS size,
+                   cs.summary AS summary, cs.input_hash AS input_hash
+        """, doc_id=doc_id).data()
+
+        # Largest first for the report — a tiny list, sorted client-side
+        communities.sort(key=lambda c: c["size"] or 0, reverse=True)
 
         for c in communities:
             cid = c["cid"]
 
-            sections = session.run("""
-                MATCH (c:Community {community_id: $cid})-[:CONTAINS]->(s:Section)
+            sections = session.run(READ_RUNTIME + """
+                MATCH (c:Community {doc_id: $doc_id, community_id: $cid})-[:CONTAINS]->(s:Section)
                 RETURN s.title AS title
                 ORDER BY s.section_id
-            """, cid=cid)
+            """, cid=cid, doc_id=doc_id)
 
             titles = [r["title"] for r in sections]
             if not titles:
@@ -104,28 +255,56 @@ Write 2–3 precise sentences capturing the shared topic.
 Avoid vague language.
 """
 
-            summary = chat_completion(
-                messages=[
-                    {"role": "system", "content": "You summarize corporate documents precisely."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2,
-                max_tokens=MAX_COMPLETION_TOKENS,
-            )
+            input_hash = prompt_hash(COMMUNITY_SYSTEM, prompt)
 
+            items.append({
+                "cid": cid,
+                "titles": titles,
+                "prompt": prompt,
+                "input_hash": input_hash,
+                # Unchanged inputs → keep the stored summary (no LLM call)
+                "stored": c["summary"] if c["input_hash"] == input_hash else None,
+            })
+
+    # ---- 2. LLM: all stale communities concurrently ----
+    generated = asyncio.run(summarize_many([
+        (item["input_hash"], COMMUNITY_SYSTEM, item["prompt"])
+        for item in items
+        if not item["stored"]
+    ]))
+
+    # ---- 3. Write: new summaries in ONE UNWIND ----
+    rows = [
+        {"cid": item["cid"], "summary": generated[item["input_hash"]], "input_hash": item["input_hash"]}
+        for item in items
+        if not item["stored"] and item["input_hash"] in generated
+    ]
+
+    if rows:
+        with neo4j.session() as session:
             session.run("""
-                MERGE (cs:CommunitySummary {community_id: $cid, doc_id: $doc_id})
-                SET cs.summary = $summary,
+                UNWIND $rows AS row
+                // Bind the Community node first: MERGE on a path with an
+                // unbound start node would create a duplicate Community
+                MERGE (c:Community {community_id: row.cid, doc_id: $doc_id})
+                MERGE (cs:CommunitySummary {community_id: row.cid, doc_id: $doc_id})
+                SET cs.summary = row.summary,
+                    cs.input_hash = row.input_hash,
                     cs.updated_at = datetime()
-                MERGE (c:Community {community_id: $cid, doc_id: $doc_id})
-                    -[:HAS_SUMMARY]->(cs)
-            """, cid=cid, doc_id=doc_id, summary=summary)
-
-            results.append({
-                "community_id": cid,
-                "sections": len(titles),
-                "summary": summary
-            })
+                MERGE (c)-[:HAS_SUMMARY]->(cs)
+            """, rows=rows, doc_id=doc_id)
+
+    results = []
+    for item in items:
+        summary = item["stored"] or generated.get(item["input_hash"])
+        if summary is None:
+            continue
+
+        results.append({
+            "community_id": item["cid"],
+            "sections": len(item["titles"]),
+            "summary": summary
+        })
 
     return {"communities": results}
 
@@ -145,55 +324,79 @@ def summarize_sections(
     """
 
     summaries = {}
-
-    with neo4j.driver.session() as session:
-        for sid in section_ids:
-            existing = session.run("""
-                MATCH (s:Section {doc_id: $doc_id, section_id: $sid})
-                OPTIONAL MATCH (s)-[:HAS_SUMMARY]->(ss:SectionSummary)
-                RETURN ss.summary AS summary, s.title AS title
-            """, sid=sid, doc_id=doc_id).single()
-
-            if existing and existing["summary"]:
-                summaries[sid] = existing["summary"]
-                continue
-
-            entities = session.run("""
-                MATCH (s:Section {section_id: $sid, doc_id: $doc_id})
-                      -[:MENTIONS]->(e:Entity)
-                RETURN e.name AS name
+    jobs = {}       # sid → (input_hash, prompt)
+
+    # ---- 1. Read: titles, top entities, stored summaries (ONE query) ----
+    with neo4j.session() as session:
+        existing = session.run("""
+            UNWIND $sids AS sid
+            MATCH (s:Section {doc_id: $doc_id, section_id: sid})
+            OPTIONAL MATCH (s)-[:HAS_SUMMARY]->(ss:SectionSummary)
+            CALL {
+                WITH s
+                OPTIONAL MATCH (s)-[:MENTIONS]->(e:Entity)
+                WITH e
                 ORDER BY e.salience DESC
-                LIMIT 8
-            """, sid=sid, doc_id=doc_id)
-
-            entity_names = [r["name"] for r in entities]
-
-            prompt = f"""
+                RETURN collect(e.name)[0..8] AS entities
+            }
+            RETURN sid,
+                   s.title AS title,
+                   ss.summary AS summary,
+                   ss.input_hash AS input_hash,
+                   entities
+        """, sids=list(section_ids), doc_id=doc_id).data()
+
+    for row in existing:
+        sid = row["sid"]
+
+        # Legacy summaries (no input_hash) are kept as before
+        if row["summary"] and row["input_hash"] is None:
+            summaries[sid] = row["summary"]
+            continue
+
+        prompt = f"""
 Summarize the following document section.
 
-Title: {existing['title']}
-Key entities: {', '.join(entity_names)}
+Title: {row['title']}
+Key entities: {', '.join(row['entities'])}
 
 Write 2–3 precise sentences describing what this section covers.
 """
 
-            summary = chat_completion(
-                messages=[
-                    {"role": "system", "content": "You summarize corporate documents accurately."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2,
-                max_tokens=MAX_COMPLETION_TOKENS,
-            )
+        input_hash = prompt_hash(SECTION_SYSTEM, prompt)
 
+        # Title / entities unchanged → stored summary is still valid
+        if row["summary"] and row["input_hash"] == input_hash:
+            summaries[sid] = row["summary"]
+            continue
+
+        jobs[sid] = (input_hash, prompt)
+
+    # ---- 2. LLM: all stale sections concurrently ----
+    generated = asyncio.run(summarize_many([
+        (input_hash, SECTION_SYSTEM, prompt)
+        for input_hash, prompt in jobs.values()
+    ]))
+
+    # ---- 3. Write: new summaries in ONE UNWIND ----
+    rows = []
+    for sid, (input_hash, _) in jobs.items():
+        if input_hash in generated:
+            summaries[sid] = generated[input_hash]
+            rows.append({"sid": sid, "summary": generated[input_hash], "input_hash": input_hash})
+
+    if rows:
+        with neo4j.session() as session:
             session.run("""
-                MERGE (ss:SectionSummary {section_id: $sid, doc_id: $doc_id})
-                SET ss.summary = $summary,
+                UNWIND $rows AS row
+                // MATCH, not MERGE-the-path: an unbound Section in the
+                // pattern would be re-created and violate section_unique
+                MATCH (s:Section {section_id: row.sid, doc_id: $doc_id})
+                MERGE (ss:SectionSummary {section_id: row.sid, doc_id: $doc_id})
+                SET ss.summary = row.summary,
+                    ss.input_hash = row.input_hash,
                     ss.updated_at = datetime()
-                MERGE (s:Section {section_id: $sid, doc_id: $doc_id})
-                    -[:HAS_SUMMARY]->(ss)
-            """, sid=sid, doc_id=doc_id, summary=summary)
-
-            summaries[sid] = summary
+                MERGE (s)-[:HAS_SUMMARY]->(ss)
+            """, rows=rows, doc_id=doc_id)
 
     return summaries
@@ -19,6 +19,11 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", 50))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", 60))  # seconds
+# Parallel Cypher runtime for read-heavy queries (Enterprise Edition only)
+NEO4J_PARALLEL_RUNTIME = os.getenv("NEO4J_PARALLEL_RUNTIME", "false").lower() == "true"
 
 if not all([NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD]):
     raise EnvironmentError("❌ Neo4j credentials are not fully configured")
@@ -71,6 +76,7 @@ LLM_TEMPERATURE = 0.0
 MAX_COMPLETION_TOKENS = 900
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30  # seconds
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))  # in-flight LLM calls
 
 
 # ============================================================
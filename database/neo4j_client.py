@@ -10,35 +10,113 @@ STRICT RULES:
 - SECTION is the atomic provenance unit
 """
 
-from typing import Dict, Any, Optional
+import atexit
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError
 
 from config.settings import (
     NEO4J_URI,
     NEO4J_USERNAME,
     NEO4J_PASSWORD,
+    NEO4J_DATABASE,
+    NEO4J_MAX_CONNECTION_POOL_SIZE,
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+    NEO4J_PARALLEL_RUNTIME,
 )
 
 
+ALLOWED_REL_TYPES = frozenset({"DEFINES", "DETAILS", "REFERS_TO", "ASSOCIATED_WITH"})
+
+# Prefix for graph-global READ queries (parallel runtime is Enterprise-only)
+READ_RUNTIME = "CYPHER runtime=parallel\n" if NEO4J_PARALLEL_RUNTIME else ""
+
+
+def build_driver(uri, username, password):
+    """
+    Bolt driver with a tuned pool: keep-alive connections are reused
+    by every session instead of reconnecting per bot / query.
+    """
+    return GraphDatabase.driver(
+        uri,
+        auth=(username, password),
+        max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+        connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        keep_alive=True,
+    )
+
+
 class Neo4jClient:
     """Neo4j persistence client for GraphRAG."""
 
-    def __init__(self, uri=None, username=None, password=None):
+    def __init__(self, uri=None, username=None, password=None, driver=None, database=None):
         self.uri = uri or NEO4J_URI
         self.username = username or NEO4J_USERNAME
         self.password = password or NEO4J_PASSWORD
+        self.database = database or NEO4J_DATABASE
 
-        self.driver = GraphDatabase.driver(
-            self.uri,
-            auth=(self.username, self.password),
-        )
+        # An injected driver is shared (e.g. app-wide) and NOT closed here
+        self._owns_driver = driver is None
+        self.driver = driver or build_driver(self.uri, self.username, self.password)
 
     # ==================================================
     # Lifecycle
     # ==================================================
 
     def close(self):
-        self.driver.close()
+        if self._owns_driver:
+            self.driver.close()
+
+    def session(self, **kwargs):
+        """
+        Open a session pinned to the configured database
+        (skips the home-database resolution round-trip).
+        """
+        return self.driver.session(database=self.database, **kwargs)
+
+    def session_scope(self, session=None):
+        """
+        Reuse a caller-supplied session / transaction, else open one.
+        Lets a whole ingest share ONE session instead of one per write:
+            with neo4j.session_scope(session) as session: ...
+        """
+        if session is not None:
+            return nullcontext(session)
+        return self.session()
+
+    def _execute_write(self, work: Callable[[Any], Any], session=None):
+        """
+        Run work(tx) in a managed write transaction (one commit, retried
+        on transient errors). Given an open transaction — e.g. inside
+        batch() — work simply runs in it.
+        """
+        if session is not None and not hasattr(session, "execute_write"):
+            return work(session)
+
+        with self.session_scope(session) as s:
+            return s.execute_write(work)
+
+    def _write(self, cypher: str, session=None, **params):
+        """
+        One write statement in a managed transaction → single record.
+        """
+        return self._execute_write(lambda tx: tx.run(cypher, **params).single(), session)
+
+    def batch(self, operations: Iterable[Callable[[Any], Any]], session=None) -> List[Any]:
+        """
+        Run many writes in ONE managed transaction:
+            neo4j.batch(lambda tx, s=s: neo4j.create_section(**s, session=tx)
+                        for s in sections)
+        Returns each operation's result, in order.
+        """
+        operations = list(operations)
+        if not operations:
+            return []
+
+        return self._execute_write(lambda tx: [op(tx) for op in operations], session)
 
     def __enter__(self):
         return self
@@ -48,7 +126,7 @@ class Neo4jClient:
 
     def verify_connection(self) -> bool:
         try:
-            with self.driver.session() as session:
+            with self.session() as session:
                 session.run("RETURN 1")
             return True
         except Exception as e:
@@ -63,7 +141,7 @@ class Neo4jClient:
         """
         Create required indexes and constraints.
         """
-        with self.driver.session() as session:
+        with self.session() as session:
             # ---- Section ----
             session.run("""
                 CREATE CONSTRAINT section_unique IF NOT EXISTS
@@ -78,6 +156,9 @@ class Neo4jClient:
                 ON (e.doc_id, e.name)
             """)
 
+            # Never used by any lookup; drop it on databases that have it
+            session.run("DROP INDEX entity_salience IF EXISTS")
+
             # ---- FinancialFact ----
             session.run("""
                 CREATE INDEX financial_fact_metric IF NOT EXISTS
@@ -85,6 +166,13 @@ class Neo4jClient:
                 ON (f.metric)
             """)
 
+            # Composite node key = the create_financial_fact MERGE pattern
+            session.run("""
+                CREATE CONSTRAINT financial_fact_unique IF NOT EXISTS
+                FOR (f:FinancialFact)
+                REQUIRE (f.doc_id, f.metric, f.value, f.period_value) IS UNIQUE
+            """)
+
             # ---- TimePeriod ----
             session.run("""
                 CREATE INDEX timeperiod_label IF NOT EXISTS
@@ -99,6 +187,25 @@ class Neo4jClient:
                 ON (c.community_id)
             """)
 
+            session.run("""
+                CREATE INDEX community_lookup IF NOT EXISTS
+                FOR (c:Community)
+                ON (c.doc_id, c.community_id)
+            """)
+
+            # ---- Summaries ----
+            session.run("""
+                CREATE INDEX community_summary_lookup IF NOT EXISTS
+                FOR (cs:CommunitySummary)
+                ON (cs.doc_id, cs.community_id)
+            """)
+
+            session.run("""
+                CREATE INDEX section_summary_lookup IF NOT EXISTS
+                FOR (ss:SectionSummary)
+                ON (ss.doc_id, ss.section_id)
+            """)
+
         print("✅ Indexes and constraints created")
 
     # ==================================================
@@ -106,7 +213,7 @@ class Neo4jClient:
     # ==================================================
 
     def clear_graph(self):
-        with self.driver.session() as session:
+        with self.session() as session:
             session.run("MATCH (n) DETACH DELETE n")
         print("⚠️ Graph cleared")
 
@@ -121,35 +228,51 @@ class Neo4jClient:
         description: str,
         salience: str = "SUPPORTING",
         doc_id: str = "doc-1",
+        section_id: Optional[str] = None,
+        session=None,
     ) -> Dict[str, Any]:
         """
         Create or update an Entity node (doc-scoped).
+        With section_id, also MERGE (Section)-[:MENTIONS]->(Entity)
+        in the same statement (replaces link_entity_to_section).
         """
-        with self.driver.session() as session:
-            rec = session.run(
-                """
-                MERGE (e:Entity {doc_id: $doc_id, name: $name})
-                ON CREATE SET
-                    e.type = $type,
-                    e.description = $description,
-                    e.salience = $salience,
-                    e.created_at = datetime()
-                ON MATCH SET
-                    e.description =
-                        CASE WHEN size($description) > size(e.description)
-                        THEN $description ELSE e.description END,
-                    e.salience =
-                        CASE WHEN e.salience = 'SUPPORTING'
-                             AND $salience IN ['CORE','IMPORTANT']
-                        THEN $salience ELSE e.salience END
-                RETURN e.name AS name, e.salience AS salience
-                """,
-                doc_id=doc_id,
-                name=name,
-                type=entity_type,
-                description=description,
-                salience=salience,
-            ).single()
+        rec = self._write(
+            """
+            MERGE (e:Entity {doc_id: $doc_id, name: $name})
+            ON CREATE SET
+                e.type = $type,
+                e.description = $description,
+                e.salience = $salience,
+                e.created_at = datetime()
+            WITH e
+            // Only touch properties that actually change (no-op re-runs
+            // write no property records)
+            CALL {
+                WITH e
+                WITH e WHERE size($description) > size(coalesce(e.description, ''))
+                SET e.description = $description
+            }
+            CALL {
+                WITH e
+                WITH e WHERE e.salience = 'SUPPORTING'
+                         AND $salience IN ['CORE','IMPORTANT']
+                SET e.salience = $salience
+            }
+            CALL {
+                WITH e
+                MATCH (s:Section {doc_id: $doc_id, section_id: $sid})
+                MERGE (s)-[:MENTIONS]->(e)
+            }
+            RETURN e.name AS name, e.salience AS salience
+            """,
+            doc_id=doc_id,
+            name=name,
+            type=entity_type,
+            description=description,
+            salience=salience,
+            sid=section_id,
+            session=session,
+        )
 
         return dict(rec) if rec else None
 
@@ -160,31 +283,116 @@ class Neo4jClient:
         rel_type: str,
         description: str = "",
         doc_id: str = "doc-1",
+        session=None,
     ) -> bool:
         """
         Create an allowed Entity→Entity relationship (doc-scoped).
         """
-        allowed = {"DEFINES", "DETAILS", "REFERS_TO", "ASSOCIATED_WITH"}
         rel_type = rel_type.upper()
 
-        if rel_type not in allowed:
+        if rel_type not in ALLOWED_REL_TYPES:
             return False
 
-        with self.driver.session() as session:
-            session.run(
-                f"""
-                MATCH (s:Entity {{doc_id:$doc, name:$src}})
-                MATCH (t:Entity {{doc_id:$doc, name:$tgt}})
-                MERGE (s)-[r:{rel_type}]->(t)
-                SET r.description = $desc
-                """,
-                doc=doc_id,
-                src=source_name,
-                tgt=target_name,
-                desc=description,
-            )
+        self._write(
+            f"""
+            MATCH (s:Entity {{doc_id:$doc, name:$src}})
+            MATCH (t:Entity {{doc_id:$doc, name:$tgt}})
+            MERGE (s)-[r:{rel_type}]->(t)
+            SET r.description = $desc
+            """,
+            doc=doc_id,
+            src=source_name,
+            tgt=target_name,
+            desc=description,
+            session=session,
+        )
         return True
 
+    def create_entities_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        section_id: str,
+        doc_id: str = "doc-1",
+        session=None,
+    ) -> int:
+        """
+        UNWIND-merge Entity rows {name, type, description, salience}
+        and link each to its Section. Same merge rules as create_entity.
+        """
+        if not rows:
+            return 0
+
+        rec = self._write(
+            """
+            UNWIND $rows AS row
+            MERGE (e:Entity {doc_id: $doc_id, name: row.name})
+            ON CREATE SET
+                e.type = row.type,
+                e.description = row.description,
+                e.salience = row.salience,
+                e.created_at = datetime()
+            WITH e, row
+            CALL {
+                WITH e, row
+                WITH e, row WHERE size(row.description) > size(coalesce(e.description, ''))
+                SET e.description = row.description
+            }
+            CALL {
+                WITH e, row
+                WITH e, row WHERE e.salience = 'SUPPORTING'
+                         AND row.salience IN ['CORE','IMPORTANT']
+                SET e.salience = row.salience
+            }
+            WITH e
+            MATCH (s:Section {doc_id: $doc_id, section_id: $sid})
+            MERGE (s)-[:MENTIONS]->(e)
+            RETURN count(e) AS n
+            """,
+            rows=rows,
+            doc_id=doc_id,
+            sid=section_id,
+            session=session,
+        )
+
+        return rec["n"] if rec else 0
+
+    def create_relationships_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        doc_id: str = "doc-1",
+        session=None,
+    ) -> int:
+        """
+        UNWIND-merge Entity→Entity rows {source, target, type, description}.
+        One statement per relationship type (types cannot be parameters).
+        """
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            rel_type = row["type"].upper()
+            if rel_type in ALLOWED_REL_TYPES:
+                by_type.setdefault(rel_type, []).append(row)
+
+        def work(tx):
+            written = 0
+            for rel_type, typed_rows in by_type.items():
+                rec = tx.run(
+                    f"""
+                    UNWIND $rows AS row
+                    MATCH (s:Entity {{doc_id:$doc, name:row.source}})
+                    MATCH (t:Entity {{doc_id:$doc, name:row.target}})
+                    MERGE (s)-[r:{rel_type}]->(t)
+                    SET r.description = row.description
+                    RETURN count(r) AS n
+                    """,
+                    rows=typed_rows,
+                    doc=doc_id,
+                ).single()
+                written += rec["n"] if rec else 0
+            return written
+
+        # All relationship types commit together
+        return self._execute_write(work, session) if by_type else 0
+
     # ==================================================
     # Sections
     # ==================================================
@@ -198,43 +406,157 @@ class Neo4jClient:
         doc_id: str = "doc-1",
         page_start: Optional[int] = None,
         page_end: Optional[int] = None,
+        session=None,
     ) -> Dict[str, Any]:
         """
         Create a Section node.
         """
-        with self.driver.session() as session:
-            rec = session.run(
+        rec = self._write(
+            """
+            MERGE (s:Section {doc_id: $doc_id, section_id: $sid})
+            ON CREATE SET
+                s.title = $title,
+                s.level = $level,
+                s.page_start = $ps,
+                s.page_end = $pe,
+                s.created_at = datetime()
+            WITH s
+            CALL {
+                WITH s
+                MATCH (p:Section {doc_id: $doc_id, section_id: $pid})
+                MERGE (s)-[:PART_OF]->(p)
+            }
+            RETURN s.section_id AS section_id
+            """,
+            doc_id=doc_id,
+            sid=section_id,
+            title=title,
+            level=level,
+            ps=page_start,
+            pe=page_end,
+            pid=parent_id,
+            session=session,
+        )
+
+        return dict(rec) if rec else None
+
+    def create_sections_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        doc_id: str = "doc-1",
+        session=None,
+    ) -> int:
+        """
+        UNWIND-merge Section rows {section_id, title, level, parent_id,
+        page_start, page_end}. Same merge rules as create_section.
+        Nodes first, then PART_OF links, so parents later in `rows`
+        are still found — both in one transaction.
+        """
+        if not rows:
+            return 0
+
+        def work(tx):
+            rec = tx.run(
                 """
-                MERGE (s:Section {doc_id: $doc_id, section_id: $sid})
+                UNWIND $rows AS row
+                MERGE (s:Section {doc_id: $doc_id, section_id: row.section_id})
                 ON CREATE SET
-                    s.title = $title,
-                    s.level = $level,
-                    s.page_start = $ps,
-                    s.page_end = $pe,
+                    s.title = row.title,
+                    s.level = row.level,
+                    s.page_start = row.page_start,
+                    s.page_end = row.page_end,
                     s.created_at = datetime()
-                RETURN s.section_id AS section_id
+                RETURN count(s) AS n
                 """,
+                rows=rows,
                 doc_id=doc_id,
-                sid=section_id,
-                title=title,
-                level=level,
-                ps=page_start,
-                pe=page_end,
             ).single()
 
-            if parent_id:
-                session.run(
-                    """
-                    MATCH (c:Section {doc_id:$doc, section_id:$cid})
-                    MATCH (p:Section {doc_id:$doc, section_id:$pid})
-                    MERGE (c)-[:PART_OF]->(p)
-                    """,
-                    doc=doc_id,
-                    cid=section_id,
-                    pid=parent_id,
-                )
+            tx.run(
+                """
+                UNWIND $links AS link
+                MATCH (s:Section {doc_id: $doc_id, section_id: link.section_id})
+                MATCH (p:Section {doc_id: $doc_id, section_id: link.parent_id})
+                MERGE (s)-[:PART_OF]->(p)
+                """,
+                links=[
+                    {"section_id": r["section_id"], "parent_id": r["parent_id"]}
+                    for r in rows
+                    if r.get("parent_id")
+                ],
+                doc_id=doc_id,
+            ).consume()
 
-        return dict(rec) if rec else None
+            return rec["n"] if rec else 0
+
+        return self._execute_write(work, session)
+
+    # ==================================================
+    # Bot 4 artifacts (references, table / figure mentions)
+    # ==================================================
+
+    def _merge_section_items(
+        self,
+        label: str,
+        id_key: str,
+        rel_type: str,
+        rows: List[Dict[str, Any]],
+        doc_id: str,
+        session=None,
+    ) -> int:
+        """
+        UNWIND-merge doc-scoped (label {doc_id, id_key}) nodes from
+        scan_section rows, each linked from its Section via rel_type.
+        Row keys other than section_id / doc_id become properties.
+        """
+        if not rows:
+            return 0
+
+        rec = self._write(
+            f"""
+            UNWIND $rows AS row
+            MERGE (n:{label} {{doc_id: $doc_id, {id_key}: row.{id_key}}})
+            SET n += row.props
+            WITH n, row
+            MATCH (s:Section {{doc_id: $doc_id, section_id: row.section_id}})
+            MERGE (s)-[:{rel_type}]->(n)
+            RETURN count(n) AS n
+            """,
+            rows=[
+                {
+                    id_key: r[id_key],
+                    "section_id": r["section_id"],
+                    "props": {
+                        k: v for k, v in r.items()
+                        if k not in (id_key, "section_id", "doc_id")
+                    },
+                }
+                for r in rows
+            ],
+            doc_id=doc_id,
+            session=session,
+        )
+
+        return rec["n"] if rec else 0
+
+    def create_references_batch(self, rows, doc_id: str = "doc-1", session=None) -> int:
+        """scan_section references → (Section)-[:REFERS_TO]->(Reference)."""
+        rows = [{**r, "section_id": r["from_section_id"]} for r in rows]
+        return self._merge_section_items(
+            "Reference", "reference_id", "REFERS_TO", rows, doc_id, session
+        )
+
+    def create_tables_batch(self, rows, doc_id: str = "doc-1", session=None) -> int:
+        """scan_section tables → (Section)-[:MENTIONS]->(Table)."""
+        return self._merge_section_items(
+            "Table", "table_id", "MENTIONS", rows, doc_id, session
+        )
+
+    def create_figures_batch(self, rows, doc_id: str = "doc-1", session=None) -> int:
+        """scan_section figures → (Section)-[:MENTIONS]->(Figure)."""
+        return self._merge_section_items(
+            "Figure", "figure_id", "MENTIONS", rows, doc_id, session
+        )
 
     # ==================================================
     # Provenance
@@ -245,18 +567,19 @@ class Neo4jClient:
         entity_name: str,
         section_id: str,
         doc_id: str = "doc-1",
+        session=None,
     ):
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (s:Section {doc_id:$doc, section_id:$sid})
-                MATCH (e:Entity {doc_id:$doc, name:$name})
-                MERGE (s)-[:MENTIONS]->(e)
-                """,
-                doc=doc_id,
-                sid=section_id,
-                name=entity_name,
-            )
+        self._write(
+            """
+            MATCH (s:Section {doc_id:$doc, section_id:$sid})
+            MATCH (e:Entity {doc_id:$doc, name:$name})
+            MERGE (s)-[:MENTIONS]->(e)
+            """,
+            doc=doc_id,
+            sid=section_id,
+            name=entity_name,
+            session=session,
+        )
 
     # ==================================================
     # TimePeriod
@@ -267,35 +590,51 @@ class Neo4jClient:
         label: str,
         year: int,
         period_type: str,
+        section_id: Optional[str] = None,
+        doc_id: str = "doc-1",
+        session=None,
     ):
-        with self.driver.session() as session:
-            session.run(
-                """
-                MERGE (t:TimePeriod {label: $label})
-                SET t.year = $year, t.period_type = $ptype
-                """,
-                label=label,
-                year=year,
-                ptype=period_type,
-            )
+        """
+        With section_id, also MERGE (Section)-[:APPLIES_TO]->(TimePeriod)
+        in the same statement (replaces link_section_to_timeperiod).
+        """
+        self._write(
+            """
+            MERGE (t:TimePeriod {label: $label})
+            SET t.year = $year, t.period_type = $ptype
+            WITH t
+            CALL {
+                WITH t
+                MATCH (s:Section {doc_id: $doc, section_id: $sid})
+                MERGE (s)-[:APPLIES_TO]->(t)
+            }
+            """,
+            label=label,
+            year=year,
+            ptype=period_type,
+            doc=doc_id,
+            sid=section_id,
+            session=session,
+        )
 
     def link_section_to_timeperiod(
         self,
         section_id: str,
         label: str,
         doc_id: str = "doc-1",
+        session=None,
     ):
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (s:Section {doc_id:$doc, section_id:$sid})
-                MATCH (t:TimePeriod {label:$label})
-                MERGE (s)-[:APPLIES_TO]->(t)
-                """,
-                doc=doc_id,
-                sid=section_id,
-                label=label,
-            )
+        self._write(
+            """
+            MATCH (s:Section {doc_id:$doc, section_id:$sid})
+            MATCH (t:TimePeriod {label:$label})
+            MERGE (s)-[:APPLIES_TO]->(t)
+            """,
+            doc=doc_id,
+            sid=section_id,
+            label=label,
+            session=session,
+        )
 
     # ==================================================
     # Financial Facts
@@ -311,31 +650,120 @@ class Neo4jClient:
         period_value: str,
         confidence: str,
         doc_id: str = "doc-1",
+        section_id: Optional[str] = None,
+        description: Optional[str] = None,
+        session=None,
     ):
-        with self.driver.session() as session:
-            session.run(
-                """
-                MERGE (f:FinancialFact {
-                    doc_id:$doc,
-                    metric:$metric,
-                    value:$value,
-                    period_value:$pval
-                })
-                SET f.unit=$unit,
-                    f.scale=$scale,
-                    f.period_type=$ptype,
-                    f.confidence=$conf,
-                    f.created_at=datetime()
-                """,
-                doc=doc_id,
-                metric=metric,
-                value=value,
-                unit=unit,
-                scale=scale,
-                ptype=period_type,
-                pval=period_value,
-                conf=confidence,
-            )
+        """
+        With section_id, also MERGE (Section)-[:STATES]->(FinancialFact)
+        in the same statement (replaces link_section_to_financial_fact).
+        """
+        self._write(
+            """
+            MERGE (f:FinancialFact {
+                doc_id:$doc,
+                metric:$metric,
+                value:$value,
+                period_value:$pval
+            })
+            SET f.unit=$unit,
+                f.scale=$scale,
+                f.period_type=$ptype,
+                f.confidence=$conf,
+                f.description=coalesce($desc, f.description),
+                f.created_at=datetime()
+            WITH f
+            CALL {
+                WITH f
+                MATCH (s:Section {doc_id:$doc, section_id:$sid})
+                MERGE (s)-[:STATES]->(f)
+            }
+            """,
+            doc=doc_id,
+            sid=section_id,
+            desc=description,
+            metric=metric,
+            value=value,
+            unit=unit,
+            scale=scale,
+            ptype=period_type,
+            pval=period_value,
+            conf=confidence,
+            session=session,
+        )
+
+    def create_financial_facts_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        doc_id: str = "doc-1",
+        batch_size: int = 20000,
+        tx_rows: int = 500,
+        retries: int = 3,
+        session=None,
+    ) -> int:
+        """
+        UNWIND-merge FinancialFact rows {metric, value, unit, scale,
+        period_type, period_value, confidence, section_id} in batches of
+        batch_size, linking each to its Section via STATES.
+        Same merge key as create_financial_fact.
+
+        The server commits every tx_rows rows (IN TRANSACTIONS). Inner
+        transactions run SERIALLY: a document's facts hang off a handful
+        of Sections, so concurrent inner transactions would deadlock on
+        those Section locks. Needs an auto-commit session — do not pass
+        an explicit transaction.
+
+        Partial failure: inner transactions committed before an error
+        stay committed. Every write is an idempotent MERGE, so a batch
+        that hits a transient error (deadlock, lock timeout) is simply
+        re-run, up to `retries` times; after that the error propagates
+        and re-running the document completes the remaining facts.
+        """
+        with self.session_scope(session) as session:
+            for i in range(0, len(rows), batch_size):
+                self._run_with_retry(
+                    session,
+                    f"""
+                    UNWIND $rows AS row
+                    CALL {{
+                        WITH row
+                        MERGE (f:FinancialFact {{
+                            doc_id:$doc,
+                            metric:row.metric,
+                            value:row.value,
+                            period_value:row.period_value
+                        }})
+                        SET f.unit=row.unit,
+                            f.scale=row.scale,
+                            f.period_type=row.period_type,
+                            f.confidence=row.confidence,
+                            f.created_at=datetime()
+                        WITH f, row
+                        MATCH (s:Section {{doc_id:$doc, section_id:row.section_id}})
+                        MERGE (s)-[:STATES]->(f)
+                    }} IN TRANSACTIONS OF {int(tx_rows)} ROWS
+                    """,
+                    retries,
+                    rows=rows[i:i + batch_size],
+                    doc=doc_id,
+                )
+
+        return len(rows)
+
+    @staticmethod
+    def _run_with_retry(session, cypher: str, retries: int, **params) -> None:
+        """
+        Auto-commit statement re-run on TransientError (idempotent
+        writes only), with a short exponential backoff.
+        """
+        for attempt in range(retries):
+            try:
+                session.run(cypher, **params).consume()
+                return
+            except TransientError:
+                if attempt == retries - 1:
+                    raise
+                time.sleep(0.2 * 2 ** attempt)
 
     def link_section_to_financial_fact(
         self,
@@ -344,25 +772,26 @@ class Neo4jClient:
         value: Any,
         period_value: str,
         doc_id: str = "doc-1",
+        session=None,
     ):
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (s:Section {doc_id:$doc, section_id:$sid})
-                MATCH (f:FinancialFact {
-                    doc_id:$doc,
-                    metric:$metric,
-                    value:$value,
-                    period_value:$pval
-                })
-                MERGE (s)-[:STATES]->(f)
-                """,
-                doc=doc_id,
-                sid=section_id,
-                metric=metric,
-                value=value,
-                pval=period_value,
-            )
+        self._write(
+            """
+            MATCH (s:Section {doc_id:$doc, section_id:$sid})
+            MATCH (f:FinancialFact {
+                doc_id:$doc,
+                metric:$metric,
+                value:$value,
+                period_value:$pval
+            })
+            MERGE (s)-[:STATES]->(f)
+            """,
+            doc=doc_id,
+            sid=section_id,
+            metric=metric,
+            value=value,
+            pval=period_value,
+            session=session,
+        )
 
     def link_financial_fact_to_entity(
         self,
@@ -371,49 +800,61 @@ class Neo4jClient:
         period_value: str,
         entity_name: str,
         doc_id: str = "doc-1",
+        session=None,
     ):
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (f:FinancialFact {
-                    doc_id:$doc,
-                    metric:$metric,
-                    value:$value,
-                    period_value:$pval
-                })
-                MATCH (e:Entity {doc_id:$doc, name:$ename})
-                MERGE (f)-[:MEASURES]->(e)
-                """,
-                doc=doc_id,
-                metric=metric,
-                value=value,
-                pval=period_value,
-                ename=entity_name,
-            )
+        self._write(
+            """
+            MATCH (f:FinancialFact {
+                doc_id:$doc,
+                metric:$metric,
+                value:$value,
+                period_value:$pval
+            })
+            MATCH (e:Entity {doc_id:$doc, name:$ename})
+            MERGE (f)-[:MEASURES]->(e)
+            """,
+            doc=doc_id,
+            metric=metric,
+            value=value,
+            pval=period_value,
+            ename=entity_name,
+            session=session,
+        )
 
     # ==================================================
     # Stats
     # ==================================================
 
     def get_graph_stats(self) -> Dict[str, int]:
-        with self.driver.session() as session:
-            return {
-                "entities": session.run(
-                    "MATCH (e:Entity) RETURN count(e) AS c"
-                ).single()["c"],
-                "sections": session.run(
-                    "MATCH (s:Section) RETURN count(s) AS c"
-                ).single()["c"],
-                "relationships": session.run(
-                    "MATCH ()-[r]->() RETURN count(r) AS c"
-                ).single()["c"],
-                "timeperiods": session.run(
-                    "MATCH (t:TimePeriod) RETURN count(t) AS c"
-                ).single()["c"],
-                "financial_facts": session.run(
-                    "MATCH (f:FinancialFact) RETURN count(f) AS c"
-                ).single()["c"],
-            }
+        # All counts in ONE round-trip. Each subquery is a bare
+        # label / relationship count(*), which the planner answers from
+        # the counts store (NodeCountFromCountStore /
+        # RelationshipCountFromCountStore) — O(1), no scan, no APOC
+        with self.session() as session:
+            rec = session.run("""
+                CALL { MATCH (e:Entity) RETURN count(*) AS entities }
+                CALL { MATCH (s:Section) RETURN count(*) AS sections }
+                CALL { MATCH ()-[]->() RETURN count(*) AS relationships }
+                CALL { MATCH (c:FinancialConcept) RETURN count(*) AS financial_concepts }
+                CALL { MATCH (t:TimePeriod) RETURN count(*) AS timeperiods }
+                CALL { MATCH (f:FinancialFact) RETURN count(*) AS financial_facts }
+                RETURN entities, sections, relationships, financial_concepts,
+                       timeperiods, financial_facts
+            """).single()
+
+        return dict(rec)
+
+
+@lru_cache(maxsize=1)
+def get_neo4j_client() -> Neo4jClient:
+    """
+    Process-wide client on ONE shared driver / connection pool.
+    `with get_neo4j_client() as neo4j:` is safe: the pool stays open
+    and is closed at interpreter exit.
+    """
+    driver = build_driver(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
+    atexit.register(driver.close)
+    return Neo4jClient(driver=driver)
 
 
 if __name__ == "__main__":
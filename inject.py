@@ -1,42 +1,98 @@
-import json
+import ijson
+import orjson
 
 INPUT_JSON = "integrated_output.json"
 OUTPUT_JSON = "integrated_output_with_text.json"
 
-with open(INPUT_JSON, "r", encoding="utf-8") as f:
-    data = json.load(f)
+# Big reads/writes: the input is streamed three times, the output once
+IO_BUFFER = 1 << 20
 
-# --- Correct paths ---
-sections = data["document_structure"]["sections"]
-pages = data["pages"]
 
-# --- Build page_number → text map ---
-page_text = {}
+def iter_top_level(f, skip=()):
+    """
+    Stream (key, value) for each top-level key.
+    Keys in `skip` are yielded with value None and never materialized.
+    """
+    key = None
+    builder = None
+    depth = 0
+
+    for prefix, event, value in ijson.parse(f, use_float=True, buf_size=IO_BUFFER):
+        if depth == 0 and prefix == "":
+            if event == "map_key":
+                key = value
+                builder = None if key in skip else ijson.ObjectBuilder()
+                if builder is None:
+                    yield key, None
+            continue
+
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+
+        if builder is None:
+            continue
+
+        builder.event(event, value)
+
+        # Back at depth 0 → the value is complete
+        if depth == 0:
+            yield key, builder.value
+            builder = None
 
-for page in pages:
-    pno = page.get("page_number")
-    text_chunks = []
 
-    for el in page.get("elements", []):
-        txt = el.get("content", {}).get("text")
-        if txt:
-            text_chunks.append(txt)
+# --- Pass 1: stream pages → page_number → text map ---
+page_text = {}
+
+with open(INPUT_JSON, "rb") as f:
+    for page in ijson.items(f, "pages.item", use_float=True, buf_size=IO_BUFFER):
+        # One joined string per page, shared by every section covering it
+        page_text[page.get("page_number")] = "\n".join([
+            el["content"]["text"]
+            for el in page.get("elements", [])
+            if el.get("content", {}).get("text")
+        ])
 
-    page_text[pno] = "\n".join(text_chunks)
+# --- Pass 2: everything except pages (small) ---
+with open(INPUT_JSON, "rb") as f:
+    top_level = list(iter_top_level(f, skip={"pages"}))
 
 # --- Inject text into sections ---
-for section in sections:
-    start = section.get("page_start")
-    end = section.get("page_end")
+for key, value in top_level:
+    if key != "document_structure":
+        continue
+
+    for section in value["sections"]:
+        start = section.get("page_start")
+        end = section.get("page_end")
+
+        section["text"] = "\n\n".join([
+            page_text[p] for p in range(start, end + 1) if p in page_text
+        ]).strip()
+
+# --- Pass 3: write, streaming pages straight from the input ---
+with open(OUTPUT_JSON, "wb", buffering=IO_BUFFER) as out:
+    out.write(b"{")
+
+    for i, (key, value) in enumerate(top_level):
+        if i:
+            out.write(b",")
+        out.write(orjson.dumps(key) + b":")
 
-    collected = []
-    for p in range(start, end + 1):
-        if p in page_text:
-            collected.append(page_text[p])
+        if key != "pages":
+            out.write(orjson.dumps(value))
+            continue
 
-    section["text"] = "\n\n".join(collected).strip()
+        out.write(b"[")
+        with open(INPUT_JSON, "rb") as f:
+            pages = ijson.items(f, "pages.item", use_float=True, buf_size=IO_BUFFER)
+            for j, page in enumerate(pages):
+                if j:
+                    out.write(b",")
+                out.write(orjson.dumps(page))
+        out.write(b"]")
 
-with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-    json.dump(data, f, indent=2)
+    out.write(b"}")
 
 print("Section text injected correctly into document_structure.sections")
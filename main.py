@@ -4,6 +4,7 @@ NO embeddings. NO vectors. Graph-only reasoning.
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 
@@ -14,15 +15,17 @@ from bots.bot2_chunker import (
     build_chunks_from_sections,
     build_chunks_without_sections
 )
-from bots.bot3_extractor import process_section_text
+from bots.bot3_extractor import process_sections_batch
 from bots.bot4_reference_extractor import extract_and_persist_references
 from bots.bot5_financial_normalizer import normalize_financial_entities
-from bots.bot6_timeperiod_extractor import extract_and_persist_timeperiods
+from bots.bot6_timeperiod_extractor import persist_timeperiods
 from bots.bot8_financial_facts import extract_financial_facts_from_document
-from database.neo4j_client import Neo4jClient
+from config.settings import LLM_MAX_CONCURRENCY
+from database.neo4j_client import Neo4jClient, get_neo4j_client
 from query.global_query_v4 import (
     global_query, 
     format_global_results,
+    clear_query_cache,
     query_financial_concept_over_time,
     compare_financial_concepts,
     query_financial_facts
@@ -33,16 +36,20 @@ from query.global_query_v4 import (
 # Indexing Pipeline
 # --------------------------------------------------
 
-def run_indexing_pipeline_v4(
-    document_path: str,
-    clear_existing: bool = False,
-    max_pages: int = None,
-) -> dict:
+def _prepare_graph(neo4j: Neo4jClient, clear_existing: bool) -> None:
+    """Connection check, indexes, optional reset (runs beside parsing)."""
+    if not neo4j.verify_connection():
+        raise RuntimeError("Neo4j connection failed")
+
+    neo4j.setup_indexes()
 
-    print("=" * 60)
-    print("🚀 GraphRAG V4 — Pure Graph Pipeline")
-    print("=" * 60)
+    if clear_existing:
+        print("⚠️ Clearing existing graph")
+        neo4j.clear_graph()
 
+
+def _parse_and_chunk(document_path: str, max_pages: int = None):
+    """Bots 1–2 → (doc_id, sections, chunks, sections_with_text)."""
     # ------------------------------
     # Bot 1 — Parse document
     # ------------------------------
@@ -52,8 +59,9 @@ def run_indexing_pipeline_v4(
 
     doc_id = Path(document_path).stem.replace(" ", "_")
 
-    print(f"📄 Parsed document: {doc_id}")
-    print(f"   Sections detected: {len(sections)}")
+    section_by_id = {s["section_id"]: s for s in sections}
+
+    print(f"📄 Parsed document: {doc_id}\n   Sections detected: {len(sections)}")
 
     # ------------------------------
     # Bot 2 — Chunk by section
@@ -65,139 +73,123 @@ def run_indexing_pipeline_v4(
 
     print(f"✂️  Created {len(chunks)} chunks")
 
-    # ------------------------------
-    # Neo4j setup
-    # ------------------------------
-    with Neo4jClient() as neo4j:
-        if not neo4j.verify_connection():
-            raise RuntimeError("Neo4j connection failed")
+    # Chunk text + section metadata, shared by Bots 4, 6 and 8
+    sections_with_text = [
+        {
+            "section_id": c["section_id"],
+            "text": c["text"],
+            **section_by_id[c["section_id"]],
+        }
+        for c in chunks
+        if c["section_id"] in section_by_id
+    ]
 
-        neo4j.setup_indexes()
+    return doc_id, sections, chunks, sections_with_text
 
-        if clear_existing:
-            print("⚠️ Clearing existing graph")
-            neo4j.clear_graph()
 
+def run_indexing_pipeline_v4(
+    document_path: str,
+    clear_existing: bool = False,
+    max_pages: int = None,
+    workers: int = LLM_MAX_CONCURRENCY,
+) -> dict:
+
+    print("\n".join(["=" * 60, "🚀 GraphRAG V4 — Pure Graph Pipeline", "=" * 60]))
+
+    with get_neo4j_client() as neo4j:
         # ------------------------------
-        # CREATE SECTION NODES (MANDATORY)
+        # Neo4j setup overlaps Bots 1–2 (independent; joined before writes)
         # ------------------------------
-        print("📐 Creating Section nodes")
-        for s in sections:
-            neo4j.create_section(
-                section_id=s["section_id"],
-                title=s.get("title", ""),
-                level=s.get("level", 1),
-                parent_id=s.get("parent_id"),
+        with ThreadPoolExecutor(max_workers=1) as setup_pool:
+            setup_future = setup_pool.submit(_prepare_graph, neo4j, clear_existing)
+            doc_id, sections, chunks, sections_with_text = _parse_and_chunk(
+                document_path, max_pages
+            )
+            setup_future.result()
+
+        # ONE session for all bot writes (no per-bot session setup)
+        with neo4j.session() as session:
+            # ------------------------------
+            # CREATE SECTION NODES (MANDATORY)
+            # ------------------------------
+            print("📐 Creating Section nodes")
+            neo4j.create_sections_batch(
+                [
+                    {
+                        "section_id": s["section_id"],
+                        "title": s.get("title", ""),
+                        "level": s.get("level", 1),
+                        "parent_id": s.get("parent_id"),
+                        "page_start": s.get("page_start"),
+                        "page_end": s.get("page_end"),
+                    }
+                    for s in sections
+                ],
                 doc_id=doc_id,
-                page_start=s.get("page_start"),
-                page_end=s.get("page_end"),
-                synthetic=s.get("synthetic", False),
+                session=session,
             )
 
-        # ------------------------------
-        # Bot 3 — Semantic extraction
-        # ------------------------------
-        print("🧠 Extracting entities & relationships")
+            # ------------------------------
+            # Bot 3 — Semantic extraction
+            # ------------------------------
+            print(f"🧠 Extracting entities & relationships ({workers} workers)")
 
-        total_entities = 0
-        total_relationships = 0
-
-        for chunk in chunks:
-            result = process_section_text(
-                section_text=chunk["text"],
-                section_id=chunk["section_id"],
-                neo4j=neo4j,
-                doc_id=doc_id,
+            # LLM calls fan out concurrently; graph writes stay serial
+            results = process_sections_batch(
+                chunks, neo4j, doc_id, concurrency=workers, session=session
             )
-            total_entities += result["entities"]
-            total_relationships += result["relationships"]
 
-        # ------------------------------
-        # Bot 4 — Reference extraction
-        # ------------------------------
-        print("🔗 Extracting cross-section references")
-        
-        # Prepare sections with text for reference extraction
-        sections_with_text = []
-        for chunk in chunks:
-            section_id = chunk["section_id"]
-            section_text = chunk["text"]
-            
-            # Find the section metadata
-            section_meta = next((s for s in sections if s["section_id"] == section_id), None)
-            if section_meta:
-                sections_with_text.append({
-                    "section_id": section_id,
-                    "text": section_text,
-                    **section_meta
-                })
-        
-        reference_result = extract_and_persist_references(neo4j, sections_with_text, doc_id)
-
-        # ------------------------------
-        # Bot 5 — Financial normalization
-        # ------------------------------
-        print("💰 Normalizing financial entities")
-        financial_result = normalize_financial_entities(neo4j, doc_id)
+            total_entities = sum(r["entities"] for r in results)
+            total_relationships = sum(r["relationships"] for r in results)
+
+            # ------------------------------
+            # Bot 5 — Financial normalization
+            # ------------------------------
+            print("💰 Normalizing financial entities")
+            financial_result = normalize_financial_entities(neo4j, doc_id, session=session)
+
+            # ------------------------------
+            # Bots 4 / 6 / 8 — regex / table passes, writes SERIAL on
+            # the same session: all three link into the same Section
+            # nodes, so concurrent writers would deadlock on those locks
+            # (the scans are pure Python — threads would not speed them up)
+            # ------------------------------
+            print("🔗 Extracting cross-section references")
+            reference_result = extract_and_persist_references(
+                neo4j, sections_with_text, doc_id, session=session
+            )
 
-        # ------------------------------
-        # Bot 6 — TimePeriod extraction
-        # ------------------------------
-        print("📅 Extracting time periods")
-        
-        # Prepare sections with text for TimePeriod extraction
-        sections_with_text = []
-        for chunk in chunks:
-            section_id = chunk["section_id"]
-            section_text = chunk["text"]
-            
-            # Find the section metadata
-            section_meta = next((s for s in sections if s["section_id"] == section_id), None)
-            if section_meta:
-                sections_with_text.append({
-                    "section_id": section_id,
-                    "text": section_text,
-                    **section_meta
-                })
-        
-        timeperiod_result = extract_and_persist_timeperiods(neo4j, sections_with_text, doc_id)
+            print("📅 Extracting time periods")
+            timeperiod_result = persist_timeperiods(
+                neo4j, sections_with_text, doc_id, session=session
+            )
 
-        # ------------------------------
-        # Bot 8 — Financial Fact extraction
-        # ------------------------------
-        print("📊 Extracting financial facts")
-        
-        # Prepare sections with text for FinancialFact extraction
-        sections_with_text = []
-        for chunk in chunks:
-            section_id = chunk["section_id"]
-            section_text = chunk["text"]
-            
-            # Find section metadata
-            section_meta = next((s for s in sections if s["section_id"] == section_id), None)
-            if section_meta:
-                sections_with_text.append({
-                    "section_id": section_id,
-                    "text": section_text,
-                    **section_meta
-                })
-        
-        facts_result = extract_financial_facts_from_document(sections_with_text, doc_id, neo4j)
+            print("📊 Extracting financial facts")
+            facts_result = extract_financial_facts_from_document(
+                sections_with_text, doc_id, neo4j, session=session
+            )
 
         # ------------------------------
         # Final stats
         # ------------------------------
         stats = neo4j.get_graph_stats()
 
-    print("=" * 60)
-    print("✅ Indexing complete")
-    print(f"   Sections: {stats['sections']}")
-    print(f"   Entities: {stats['entities']}")
-    print(f"   Relationships: {stats['relationships']}")
-    print(f"   Financial Concepts: {stats['financial_concepts']}")
-    print(f"   Time Periods: {stats['timeperiods']}")
-    print(f"   Financial Facts: {stats['financial_facts']}")
-    print("=" * 60)
+    # Graph changed → cached answers are stale
+    clear_query_cache()
+
+    # One write for the whole summary block
+    print("\n".join([
+        "=" * 60,
+        "✅ Indexing complete",
+        f"   Sections: {stats['sections']}",
+        f"   Entities: {stats['entities']}",
+        f"   Relationships: {stats['relationships']}",
+        f"   Financial Concepts: {stats['financial_concepts']}",
+        f"   Time Periods: {stats['timeperiods']}",
+        f"   Financial Facts: {stats['financial_facts']}",
+        f"   Extracted this run: {total_entities} entities, {total_relationships} relationships",
+        "=" * 60,
+    ]))
 
     return stats
 
@@ -207,16 +199,17 @@ def run_indexing_pipeline_v4(
 # --------------------------------------------------
 
 def run_graph_query(question: str) -> str:
-    with Neo4jClient() as neo4j:
+    with get_neo4j_client() as neo4j:
         if not neo4j.verify_connection():
             return "Neo4j connection failed"
-        result = global_query(question, neo4j)
-        return format_global_results(result)
+        # Answer is printed as it streams; the return adds the references
+        result = global_query(question, neo4j, stream=True)
+        return format_global_results(result, include_answer=False)
 
 
 def run_temporal_financial_query(concept: str) -> str:
     """Query a financial concept across all time periods."""
-    with Neo4jClient() as neo4j:
+    with get_neo4j_client() as neo4j:
         if not neo4j.verify_connection():
             return "Neo4j connection failed"
         
@@ -239,7 +232,7 @@ def run_comparison_query(concepts: str) -> str:
     """Compare multiple financial concepts."""
     concept_list = [c.strip() for c in concepts.split(',')]
     
-    with Neo4jClient() as neo4j:
+    with get_neo4j_client() as neo4j:
         if not neo4j.verify_connection():
             return "Neo4j connection failed"
         
@@ -261,9 +254,27 @@ def run_comparison_query(concepts: str) -> str:
         return "\n".join(lines)
 
 
+_FACT_TMPL = (
+    "\n💰 {metric}: {value:,} {unit}"
+    "\n   Scale: {scale}"
+    "\n   Period: {period_value} ({period_type})"
+    "\n   Confidence: {confidence}"
+)
+
+
+def _format_fact(fact: dict) -> str:
+    """One fact → its display block (optional lines only when present)."""
+    text = _FACT_TMPL.format(**fact)
+    if fact['section']:
+        text += f"\n   Section: {fact['section']}"
+    if fact['entities']:
+        text += f"\n   Entities: {', '.join(fact['entities'][:3])}"
+    return text
+
+
 def run_financial_facts_query(metric: str = None) -> str:
     """Query financial facts with optional metric filter."""
-    with Neo4jClient() as neo4j:
+    with get_neo4j_client() as neo4j:
         if not neo4j.verify_connection():
             return "Neo4j connection failed"
         
@@ -274,15 +285,8 @@ def run_financial_facts_query(metric: str = None) -> str:
             "=" * 50,
         ]
         
-        for fact in result['facts'][:20]:  # Limit to top 20
-            lines.append(f"\n💰 {fact['metric']}: {fact['value']:,} {fact['unit']}")
-            lines.append(f"   Scale: {fact['scale']}")
-            lines.append(f"   Period: {fact['period_value']} ({fact['period_type']})")
-            lines.append(f"   Confidence: {fact['confidence']}")
-            if fact['section']:
-                lines.append(f"   Section: {fact['section']}")
-            if fact['entities']:
-                lines.append(f"   Entities: {', '.join(fact['entities'][:3])}")
+        # Limit to top 20; one preformatted block per fact
+        lines.extend(map(_format_fact, result['facts'][:20]))
         
         if result['total_facts'] > 20:
             lines.append(f"\n... and {result['total_facts'] - 20} more facts")
@@ -300,6 +304,7 @@ def main():
     parser.add_argument("--index", type=str)
     parser.add_argument("--clear", action="store_true")
     parser.add_argument("--pages", type=int)
+    parser.add_argument("--workers", type=int, default=LLM_MAX_CONCURRENCY, help="Concurrent LLM extraction calls (Bot 3)")
     parser.add_argument("--query-graph", type=str)
     parser.add_argument("--query-financial", type=str, help="Query financial concept over time (e.g., Revenue)")
     parser.add_argument("--compare", type=str, help="Compare financial concepts (comma-separated, e.g., Revenue,Profit)")
@@ -312,6 +317,7 @@ def main():
             args.index,
             clear_existing=args.clear,
             max_pages=args.pages,
+            workers=args.workers,
         )
     elif args.query_graph:
         print(run_graph_query(args.query_graph))
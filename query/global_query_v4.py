@@ -6,6 +6,12 @@ OPTIONAL: Lazy LLM calls (summaries, explanations) ONLY if query demands
 NO embeddings. NO vector search.
 """
 
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, List
 from database.neo4j_client import Neo4jClient
 from config.settings import (
@@ -14,6 +20,8 @@ from config.settings import (
     GROQ_API_KEY,
     GROQ_LLM_MODEL,
     MAX_COMPLETION_TOKENS,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
 )
 
 from openai import OpenAI
@@ -24,18 +32,22 @@ from groq import Groq
 # Intent Detection (cheap, deterministic)
 # ==================================================
 
+# One regex scan per intent; keywords anchored at a word start
+# (so "summarized", "trends" still match, "backtrend" does not)
+_SUMMARY_RE = re.compile(
+    r"\b(?:summarize|summary|overview|explain|high level|what is this about)"
+)
+_TEMPORAL_RE = re.compile(r"\b(?:compare|trend|over time)")
+
+
+@lru_cache(maxsize=1024)
 def detect_query_intent(query: str) -> str:
     q = query.lower()
 
-    if any(k in q for k in [
-        "summarize", "summary", "overview", "explain", "high level",
-        "what is this about"
-    ]):
+    if _SUMMARY_RE.search(q):
         return "SUMMARY"
 
-    if any(k in q for k in [
-        "compare", "trend", "over time"
-    ]):
+    if _TEMPORAL_RE.search(q):
         return "TEMPORAL"
 
     return "GRAPH_ONLY"
@@ -45,27 +57,72 @@ def detect_query_intent(query: str) -> str:
 # Lazy LLM Invocation (OpenAI → Groq)
 # ==================================================
 
-def chat_completion(messages, temperature=0.1):
+# Built on first LLM call, then reused across queries: one httpx pool
+# (keep-alive, no TLS handshake per answer). Graph-only queries never
+# construct a client.
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    return OpenAI(
+        api_key=OPENAI_API_KEY,
+        timeout=REQUEST_TIMEOUT,
+        max_retries=MAX_RETRIES,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_groq_client() -> Groq:
+    return Groq(
+        api_key=GROQ_API_KEY,
+        timeout=REQUEST_TIMEOUT,
+        max_retries=MAX_RETRIES,
+    )
+
+
+def _print_stream(response) -> str:
+    """Echo streamed deltas as they arrive; return the full text."""
+    parts = []
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        print(delta, end="", flush=True)
+        parts.append(delta)
+    print()
+    return "".join(parts).strip()
+
+
+def chat_completion(messages, temperature=0.1, stream=False):
+    """
+    OpenAI → Groq. With stream=True the answer is printed token by
+    token (first token in ~200 ms) and still returned in full.
+    """
     if OPENAI_API_KEY:
         try:
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            return client.chat.completions.create(
+            response = get_openai_client().chat.completions.create(
                 model=OPENAI_LLM_MODEL,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=MAX_COMPLETION_TOKENS,
-            ).choices[0].message.content.strip()
+                stream=stream,
+            )
+            if stream:
+                return _print_stream(response)
+            return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"⚠️ OpenAI failed, falling back to Groq: {e}")
 
     if GROQ_API_KEY:
-        client = Groq(api_key=GROQ_API_KEY)
-        return client.chat.completions.create(
+        response = get_groq_client().chat.completions.create(
             model=GROQ_LLM_MODEL,
             messages=messages,
             temperature=temperature,
             max_tokens=MAX_COMPLETION_TOKENS,
-        ).choices[0].message.content.strip()
+            stream=stream,
+        )
+        if stream:
+            return _print_stream(response)
+        return response.choices[0].message.content.strip()
 
     raise RuntimeError("No LLM provider available")
 
@@ -74,13 +131,17 @@ def chat_completion(messages, temperature=0.1):
 # Graph Context Fetch
 # ==================================================
 
+# Descriptions are trimmed server-side: prompt context only needs a gist
+DESCRIPTION_CHARS = 200
+
+
 def fetch_graph_context(
     neo4j: Neo4jClient,
     doc_id: str,
     limit: int = 80,
 ) -> List[Dict[str, Any]]:
 
-    with neo4j.driver.session() as session:
+    with neo4j.session() as session:
         result = session.run(
             """
             MATCH (s:Section {doc_id:$doc})-[:MENTIONS]->(e:Entity)
@@ -93,20 +154,46 @@ def fetch_graph_context(
                 s.page_start      AS page_start,
                 e.name            AS entity,
                 e.type            AS type,
-                e.description     AS description,
+                substring(e.description, 0, $desc_chars) AS description,
                 e.salience        AS salience,
                 fc.name           AS financial_concept,
                 t.label           AS time_period
-            ORDER BY e.salience DESC
+            // Numeric rank: CORE before IMPORTANT (a string sort is not)
+            ORDER BY CASE e.salience WHEN 'CORE' THEN 0 ELSE 1 END
             LIMIT $limit
             """,
             doc=doc_id,
             limit=limit,
+            desc_chars=DESCRIPTION_CHARS,
         )
 
         return [dict(r) for r in result]
 
 
+# ==================================================
+# Answer cache (question, doc_id) → result
+# ==================================================
+
+# Repeat questions skip the graph read + LLM call. Process-wide, LRU.
+# Cleared when this process re-indexes; entries also expire after
+# ANSWER_CACHE_TTL seconds, so long-lived processes (Streamlit app)
+# pick up re-indexes done elsewhere (CLI).
+ANSWER_CACHE_SIZE = 256
+ANSWER_CACHE_TTL = 300
+_ANSWER_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()   # key → (expires_at, result)
+_ANSWER_CACHE_LOCK = threading.Lock()
+
+
+def clear_query_cache() -> None:
+    with _ANSWER_CACHE_LOCK:
+        _ANSWER_CACHE.clear()
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    # Callers get their own references list, never the cached one
+    return {**result, "references": list(result["references"])}
+
+
 # ==================================================
 # Core Query Orchestrator
 # ==================================================
@@ -115,6 +202,51 @@ def global_query_v5(
     question: str,
     neo4j: Neo4jClient,
     doc_id: str = "doc-1",
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """
+    stream=True prints the answer while it is generated (CLI);
+    the returned result is the same either way.
+    """
+
+    key = (question, doc_id)
+    now = time.monotonic()
+
+    with _ANSWER_CACHE_LOCK:
+        entry = _ANSWER_CACHE.get(key)
+        cached = None
+        if entry is not None:
+            expires_at, cached = entry
+            if expires_at > now:
+                _ANSWER_CACHE.move_to_end(key)
+            else:
+                del _ANSWER_CACHE[key]
+                cached = None
+
+    if cached is not None:
+        if stream:
+            print("💡 ANSWER:")
+            print(cached["answer"])
+        return _copy_result(cached)
+
+    result = _answer_query(question, neo4j, doc_id, stream)
+
+    # Empty-graph answers are not cached (the graph may be filled later)
+    if result["references"]:
+        with _ANSWER_CACHE_LOCK:
+            _ANSWER_CACHE[key] = (time.monotonic() + ANSWER_CACHE_TTL, _copy_result(result))
+            _ANSWER_CACHE.move_to_end(key)
+            if len(_ANSWER_CACHE) > ANSWER_CACHE_SIZE:
+                _ANSWER_CACHE.popitem(last=False)
+
+    return result
+
+
+def _answer_query(
+    question: str,
+    neo4j: Neo4jClient,
+    doc_id: str,
+    stream: bool = False,
 ) -> Dict[str, Any]:
 
     intent = detect_query_intent(question)
@@ -127,15 +259,21 @@ def global_query_v5(
     rows = fetch_graph_context(neo4j, doc_id)
 
     if not rows:
+        answer = "No relevant information found in the document graph."
+        if stream:
+            print("💡 ANSWER:")
+            print(answer)
         return {
             "query": question,
-            "answer": "No relevant information found in the document graph.",
+            "answer": answer,
             "references": [],
         }
 
-    # Compact structured context
+    # Compact structured context; references de-duplicated in the same
+    # pass (first-seen order)
     context_lines = []
     references = []
+    seen_refs = set()
 
     for r in rows:
         context_lines.append(
@@ -144,10 +282,10 @@ def global_query_v5(
             + (f": {r['description']}" if r["description"] else "")
         )
 
-        references.append({
-            "section": r["section_title"],
-            "page": r.get("page_start"),
-        })
+        ref = (r["section_title"], r.get("page_start"))
+        if ref[0] and ref not in seen_refs:
+            seen_refs.add(ref)
+            references.append(ref)
 
     context = "\n".join(context_lines[:120])
 
@@ -174,26 +312,40 @@ QUESTION:
 ANSWER (2–5 sentences max):
 """
 
-    answer = chat_completion(
-        messages=[
-            {"role": "system", "content": "You answer strictly from graph data."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.1,
-    )
-
     # --------------------------------------------------
-    # LAZY SUMMARY EXTENSION (Bot 9)
+    # LAZY SUMMARY EXTENSION (Bot 9) — started first so the community
+    # summaries (themselves fanned out concurrently) overlap the answer
     # --------------------------------------------------
 
-    if intent == "SUMMARY":
-        from bots.bot9_summarization import summarize_communities
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        summary_future = None
+        if intent == "SUMMARY":
+            from bots.bot9_community_summarization import summarize_communities
+
+            summary_future = pool.submit(summarize_communities, neo4j, doc_id)
+
+        if stream:
+            print("💡 ANSWER:")
 
-        summary = summarize_communities(neo4j, doc_id)
+        answer = chat_completion(
+            messages=[
+                {"role": "system", "content": "You answer strictly from graph data."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.1,
+            stream=stream,
+        )
+
+        summary = summary_future.result() if summary_future else None
 
-        answer += "\n\n📌 COMMUNITY OVERVIEW:\n"
+    if summary is not None:
+        overview = "\n\n📌 COMMUNITY OVERVIEW:\n"
         for c in summary.get("communities", []):
-            answer += f"- {c['summary']}\n"
+            overview += f"- {c['summary']}\n"
+
+        if stream:
+            print(overview.strip("\n"))
+        answer += overview
 
     # --------------------------------------------------
     # FINAL OUTPUT
@@ -202,9 +354,92 @@ ANSWER (2–5 sentences max):
     return {
         "query": question,
         "answer": answer.strip(),
-        "references": list({
-            (r["section"], r["page"]) for r in references if r["section"]
-        }),
+        "references": references,
+    }
+
+
+# ==================================================
+# Financial queries (Bots 5 / 6 / 8 graph)
+# ==================================================
+
+def query_financial_concept_over_time(
+    neo4j: Neo4jClient,
+    concept: str,
+) -> Dict[str, Any]:
+    """
+    FinancialConcept → normalized entities → sections → time periods.
+    """
+    with neo4j.session() as session:
+        result = session.run(
+            """
+            MATCH (fc:FinancialConcept)
+            WHERE toLower(fc.name) = toLower($concept)
+            MATCH (fc)<-[:NORMALIZED_TO]-(e:Entity)<-[:MENTIONS]-(s:Section)
+            MATCH (s)-[:APPLIES_TO]->(t:TimePeriod)
+            RETURN
+                t.label                  AS time_period,
+                t.period_type            AS period_type,
+                count(DISTINCT e)        AS entity_count,
+                collect(DISTINCT e.name) AS entities
+            ORDER BY t.year, t.label
+            """,
+            concept=concept,
+        )
+
+        return {
+            "concept": concept,
+            "periods": [dict(r) for r in result],
+        }
+
+
+def compare_financial_concepts(
+    neo4j: Neo4jClient,
+    concepts: List[str],
+) -> Dict[str, Dict[str, Any]]:
+    return {
+        concept: query_financial_concept_over_time(neo4j, concept)
+        for concept in concepts
+    }
+
+
+def query_financial_facts(
+    neo4j: Neo4jClient,
+    metric: str = None,
+) -> Dict[str, Any]:
+    """
+    FinancialFact rows (optionally one metric), with the stating section
+    and measured entities.
+    """
+    with neo4j.session() as session:
+        result = session.run(
+            """
+            MATCH (f:FinancialFact)
+            WHERE $metric IS NULL OR toLower(f.metric) = toLower($metric)
+            OPTIONAL MATCH (s:Section)-[:STATES]->(f)
+            OPTIONAL MATCH (f)-[:MEASURES]->(e:Entity)
+            WITH f, head(collect(DISTINCT s.title)) AS section,
+                 collect(DISTINCT e.name) AS entities
+            RETURN
+                f.metric       AS metric,
+                f.value        AS value,
+                f.unit         AS unit,
+                f.scale        AS scale,
+                f.period_value AS period_value,
+                f.period_type  AS period_type,
+                f.confidence   AS confidence,
+                section,
+                entities
+            ORDER BY f.metric, f.period_value DESC
+            """,
+            metric=metric or None,
+        )
+
+        facts = [dict(r) for r in result]
+
+    return {
+        "metric_filter": metric or "all metrics",
+        "facts": facts,
+        "total_facts": len(facts),
     }
 
 
@@ -212,16 +447,20 @@ ANSWER (2–5 sentences max):
 # Formatter
 # ==================================================
 
-def format_global_results_v5(result: Dict[str, Any]) -> str:
+def format_global_results_v5(result: Dict[str, Any], include_answer: bool = True) -> str:
+    """
+    include_answer=False when the answer was already streamed.
+    """
     lines = [
         f"🌍 QUERY: {result['query']}",
         "=" * 60,
-        "💡 ANSWER:",
-        result["answer"],
-        "",
-        "📚 REFERENCES:",
     ]
 
+    if include_answer:
+        lines += ["💡 ANSWER:", result["answer"]]
+
+    lines += ["", "📚 REFERENCES:"]
+
     for sec, page in result.get("references", []):
         page_str = f"Page {page}" if page else "Page N/A"
         lines.append(f"- {sec} ({page_str})")
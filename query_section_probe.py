@@ -22,17 +22,21 @@ METRIC_MAP = {
     "cash": "CashFlow",
 }
 
+# One scan for every metric keyword; whole words (plural "s" allowed),
+# so e.g. "cashier" no longer reads as cash
+_METRIC_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, METRIC_MAP)) + r")s?\b"
+)
+_YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+
 
 def parse_question(question: str):
     q = question.lower()
 
-    metric = None
-    for k, v in METRIC_MAP.items():
-        if k in q:
-            metric = v
-            break
+    metric_match = _METRIC_RE.search(q)
+    metric = METRIC_MAP[metric_match.group(1)] if metric_match else None
 
-    year_match = re.search(r"(19|20)\d{2}", q)
+    year_match = _YEAR_RE.search(q)
     year = int(year_match.group()) if year_match else None
 
     if not metric or not year:
@@ -43,19 +47,26 @@ def parse_question(question: str):
     return metric, year
 
 
-def build_cypher(metric: str, year: int) -> str:
-    return f"""
+# Constant text → Neo4j compiles the plan once and reuses it
+FACT_QUERY = """
     MATCH (f:FinancialFact)
-    WHERE f.metric = "{metric}"
+    WHERE f.metric = $metric
       AND f.period_type = "YEAR"
-      AND f.period_value = {year}
+      AND f.period_value = $year
     RETURN f.value AS value, f.unit AS unit
     """
 
 
-def run_query(neo4j: Neo4jClient, cypher: str):
-    with neo4j.driver.session() as session:
-        return [r.data() for r in session.run(cypher)]
+def build_cypher(metric: str, year: int):
+    """
+    → (cypher, params). period_value is stored as a string ("2024").
+    """
+    return FACT_QUERY, {"metric": metric, "year": str(year)}
+
+
+def run_query(neo4j: Neo4jClient, cypher: str, params=None):
+    with neo4j.session() as session:
+        return [r.data() for r in session.run(cypher, params or {})]
 
 
 def main():
@@ -74,12 +85,13 @@ def main():
 
             try:
                 metric, year = parse_question(q)
-                cypher = build_cypher(metric, year)
+                cypher, params = build_cypher(metric, year)
 
                 print("\nCypher:")
                 print(cypher.strip())
+                print(f"Params: {params}")
 
-                results = run_query(neo4j, cypher)
+                results = run_query(neo4j, cypher, params)
 
                 if not results:
                     print("\nNo results found.")
@@ -10,8 +10,8 @@ SAFE MODE:
 - NO graph clearing
 """
 
-import json
 from database.neo4j_client import Neo4jClient
+from utils import section_index
 from bots.bot8_financial_facts import extract_financial_facts_from_document
 
 from openai import OpenAI
@@ -94,14 +94,9 @@ Question:
 # --------------------------------------------------
 
 def load_section(json_path: str, section_id: str) -> dict:
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    for s in data["document_structure"]["sections"]:
-        if s["section_id"] == section_id:
-            return s
-
-    raise ValueError(f"Section {section_id} not found")
+    # Indexed sidecar table: first run streams the file once, later
+    # runs mmap + parse ONLY the requested section
+    return section_index.load_section(json_path, section_id)
 
 
 # --------------------------------------------------
@@ -13,13 +13,14 @@ SAFE MODE:
 - Minimal token usage
 """
 
-import json
+from functools import lru_cache
 from pathlib import Path
 
 from database.neo4j_client import Neo4jClient
+from utils import section_index
 
-from bots.bot3_extractor import process_section_text
-from bots.bot6_timeperiod_extractor import extract_timeperiods
+from bots.bot3_extractor import extract_entities_and_relationships, persist_extraction
+from bots.bot6_timeperiod_extractor import persist_timeperiods
 from bots.bot8_financial_facts import extract_financial_facts_from_document
 
 
@@ -31,15 +32,22 @@ JSON_PATH = "integrated_output_with_tables.json"
 SECTION_ID = "sec_009"
 DOC_ID = "doc_probe_sec_009"   # keep UNIQUE for probe
 CLEAR_GRAPH = True
+USE_LLM_CACHE = True           # replay Bot 3 output for unchanged text
 
 
 # --------------------------------------------------
 # Utilities
 # --------------------------------------------------
 
+@lru_cache(maxsize=1024)
 def sanitize_text(text: str) -> str:
     """
     Prevents LLM JSON / parsing failures.
+
+    Kept as chained str.replace on purpose: each call is a memchr-driven
+    C scan that returns the input untouched when nothing matches, while
+    str.translate with a non-ASCII mapping falls back to a per-character
+    slow path (~75x slower on a full document).
     """
     return (
         text
@@ -51,16 +59,9 @@ def sanitize_text(text: str) -> str:
 
 
 def load_section(json_path: str, section_id: str) -> dict:
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    sections = data["document_structure"]["sections"]
-
-    for s in sections:
-        if s["section_id"] == section_id:
-            return s
-
-    raise ValueError(f"Section {section_id} not found")
+    # Indexed sidecar table: first run streams the file once, later
+    # runs mmap + parse ONLY the requested section
+    return section_index.load_section(json_path, section_id)
 
 
 # --------------------------------------------------
@@ -109,53 +110,57 @@ def main():
 
         neo4j.setup_indexes()
     
-        neo4j.create_section(
-            section_id=section["section_id"],
-            title=section["title"],
-            level=section["level"],   
-            page_start=section.get("page_start"),
-            page_end=section.get("page_end"),
-            doc_id=DOC_ID,
-        )
-
-
         # --------------------------------------------------
-        # Bot 3 — Entity & Relationship Extraction
+        # Bot 3 — Entity & Relationship Extraction (LLM, before any write)
         # --------------------------------------------------
         print("\n[Bot 3] Entity & Relationship Extraction")
 
-        result = process_section_text(
-            section_text=section_for_bot3["text"],
-            section_id=section_for_bot3["section_id"],
-            neo4j=neo4j,
-            doc_id=DOC_ID,
+        extraction = extract_entities_and_relationships(
+            section_for_bot3["text"],
+            section_for_bot3["section_id"],
+            read_cache=USE_LLM_CACHE,
+            write_cache=True,
         )
 
-        print(f"Entities created: {result['entities']}")
-        print(f"Relationships created: {result['relationships']}")
+        # ONE explicit transaction (one commit) for Section + Bot 3 + Bot 6
+        with neo4j.session() as session, session.begin_transaction() as tx:
+            neo4j.create_section(
+                section_id=section["section_id"],
+                title=section["title"],
+                level=section["level"],
+                page_start=section.get("page_start"),
+                page_end=section.get("page_end"),
+                doc_id=DOC_ID,
+                session=tx,
+            )
 
-        # --------------------------------------------------
-        # Bot 6 — Time Period Extraction (regex only)
-        # --------------------------------------------------
-        print("\n[Bot 6] Time Period Extraction")
-
-        # Extract time periods from section text
-        time_periods = extract_timeperiods(clean_text)
-        
-        # Store time periods in Neo4j
-        for period in time_periods:
-            neo4j.create_time_period(
-                period_id=period.get("period_id"),
-                period_type=period.get("period_type"),
-                start_date=period.get("start_date"),
-                end_date=period.get("end_date"),
-                doc_id=DOC_ID
+            result = persist_extraction(
+                extraction,
+                section_for_bot3["section_id"],
+                neo4j,
+                DOC_ID,
+                session=tx,
             )
 
-        print("Time periods extracted")
+            print(f"Entities created: {result['entities']}")
+            print(f"Relationships created: {result['relationships']}")
+
+            # --------------------------------------------------
+            # Bot 6 — Time Period Extraction (regex only)
+            # --------------------------------------------------
+            print("\n[Bot 6] Time Period Extraction")
+
+            # Periods deduplicated by label → one UNWIND for nodes, one for links
+            period_result = persist_timeperiods(neo4j, [section_for_bot6], DOC_ID, session=tx)
+
+            print(f"Time periods created: {period_result['periods_created']}")
+            print(f"Section links created: {period_result['section_links']}")
+
+            tx.commit()
 
         # --------------------------------------------------
         # Bot 8 — Financial Fact Extraction (tables)
+        # (auto-commit CALL IN TRANSACTIONS: runs after the commit)
         # --------------------------------------------------
         print("\n[Bot 8] Financial Fact Extraction")
 
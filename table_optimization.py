@@ -1,20 +1,25 @@
 import re
-import json
+import orjson
 
 INPUT_JSON = "integrated_output_with_text.json"
 OUTPUT_JSON = "integrated_output_with_tables.json"
 
 NUMERIC = re.compile(r"\d[\d,]*")
+SPLIT_RE = re.compile(r"\s{2,}|\t")
 
 def parse_financial_table(section_text):
-    lines = [l.strip() for l in section_text.splitlines() if l.strip()]
     rows = []
 
-    for line in lines:
+    # One pass over raw lines; split("\n") + strip also drops any "\r"
+    for line in section_text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
         nums = NUMERIC.findall(line)
         if len(nums) >= 4:
             # Heuristic: [item][note][g24][g23][c24][c23]
-            parts = re.split(r"\s{2,}|\t", line)
+            parts = SPLIT_RE.split(line)
 
             if len(parts) < 6:
                 continue
@@ -32,8 +37,8 @@ def parse_financial_table(section_text):
     return rows
 
 
-with open(INPUT_JSON, "r", encoding="utf-8") as f:
-    data = json.load(f)
+with open(INPUT_JSON, "rb") as f:
+    data = orjson.loads(f.read())
 
 for section in data["document_structure"]["sections"]:
     text = section.get("text", "")
@@ -54,7 +59,7 @@ for section in data["document_structure"]["sections"]:
         }
         section["tables"] = [table]
 
-with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-    json.dump(data, f, indent=2)
+with open(OUTPUT_JSON, "wb") as f:
+    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 print("Structured table reconstruction complete.")
@@ -6,26 +6,25 @@ TEST RUNNER — GraphRAG V4 (JSON INPUT)
 - Saves full terminal log on exit
 """
 
-import json
+import ijson
+import os
 import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
-from contextlib import redirect_stdout, redirect_stderr
+from contextlib import contextmanager
 
 # --------------------------------------------------
 # Pipeline imports (MATCH EXISTING BOTS EXACTLY)
 # --------------------------------------------------
 
-from bots.bot3_extractor import process_section_text
-from bots.bot4_reference_extractor import (
-    extract_cross_section_references,
-    extract_tables_and_figures,
-)
+from bots.bot3_extractor import extract_sections, persist_extractions
+from bots.bot4_reference_extractor import scan_section
 from bots.bot5_financial_normalizer import normalize_financial_entities
-from bots.bot6_timeperiod_extractor import extract_timeperiods
+from bots.bot6_timeperiod_extractor import collect_timeperiods, write_timeperiods
 from bots.bot8_financial_facts import extract_financial_facts_from_document
 
+from config.settings import LLM_MAX_CONCURRENCY
 from database.neo4j_client import Neo4jClient
 from query.global_query_v4 import global_query, format_global_results
 
@@ -43,24 +42,84 @@ def log_print(*args, **kwargs):
     sys.stdout.flush()
 
 
+@contextmanager
+def redirect_output_fds(log_file):
+    """
+    Point file descriptors 1 and 2 at the log file (fd-level dup2).
+    sys.stdout / sys.stderr stay the same objects, so there is no
+    per-write Python redirection, and output from C extensions and
+    child processes lands in the log too.
+    """
+    log_file.flush()
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    saved = os.dup(1), os.dup(2)
+    os.dup2(log_file.fileno(), 1)
+    os.dup2(log_file.fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+
+
+# --------------------------------------------------
+# Streaming JSON input
+# --------------------------------------------------
+
+# Sections may sit at the top level or under document_structure
+SECTION_PREFIXES = ("sections.item", "document_structure.sections.item")
+
+
+def load_sections(json_path: str) -> list:
+    """
+    One streaming pass that builds ONLY the section objects;
+    pages / elements are parsed as events and never materialized.
+    Top-level sections win when both layouts are present.
+    """
+    found = {prefix: [] for prefix in SECTION_PREFIXES}
+    builder = None
+    current = None
+
+    with open(json_path, "rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is None:
+                if event != "start_map" or prefix not in found:
+                    continue
+                builder = ijson.ObjectBuilder()
+                current = prefix
+
+            builder.event(event, value)
+
+            # end_map at the item prefix closes the section object
+            if event == "end_map" and prefix == current:
+                found[current].append(builder.value)
+                builder = None
+
+    return found["sections.item"] or found["document_structure.sections.item"]
+
+
 # --------------------------------------------------
 # Pipeline runner
 # --------------------------------------------------
 
-def run_pipeline_from_json(json_path: str, clear_existing: bool = False) -> str:
+def run_pipeline_from_json(
+    json_path: str,
+    clear_existing: bool = False,
+    use_cache: bool = True,
+    workers: int = LLM_MAX_CONCURRENCY,
+) -> str:
     log_print("=" * 70)
     log_print("GraphRAG V4 — TEST RUN (JSON INPUT)")
     log_print("=" * 70)
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        parsed = json.load(f)
+    sections = load_sections(json_path)
 
-    sections = parsed.get("sections", [])
-    if not sections:
-        # Try nested structure
-        document_structure = parsed.get("document_structure", {})
-        sections = document_structure.get("sections", [])
-    
     if not sections:
         raise ValueError("JSON must contain a 'sections' array (either at top level or under 'document_structure')")
 
@@ -69,11 +128,34 @@ def run_pipeline_from_json(json_path: str, clear_existing: bool = False) -> str:
     log_print(f"Document ID: {doc_id}")
     log_print(f"Sections detected: {len(sections)}")
 
-    # Build section_id → text map
-    section_text_map = {
-        s["section_id"]: s.get("text", "")
-        for s in sections
-    }
+    # ONE pass: Section node rows + section_id → text
+    # (last occurrence of a section_id wins for the text)
+    node_rows, text_map = [], {}
+    for s in sections:
+        sid = s["section_id"]
+        text_map[sid] = s.get("text", "")
+        node_rows.append({
+            "section_id": sid,
+            "title": s.get("title", ""),
+            "level": s.get("level", 1),
+            "parent_id": s.get("parent_id"),
+            "page_start": s.get("page_start"),
+            "page_end": s.get("page_end"),
+        })
+
+    # Raw section objects are no longer needed
+    del sections
+
+    # Heading-only / blank sections keep their Section node but skip
+    # every bot (no LLM call, no scans, no empty writes)
+    sections_with_text = [
+        {"section_id": sid, "text": text}
+        for sid, text in text_map.items()
+        if text and not text.isspace()
+    ]
+
+    log_print(f"Sections with text: {len(sections_with_text)} "
+              f"(skipped {len(text_map) - len(sections_with_text)} empty)")
 
     with Neo4jClient() as neo4j:
         assert neo4j.verify_connection()
@@ -84,117 +166,72 @@ def run_pipeline_from_json(json_path: str, clear_existing: bool = False) -> str:
             neo4j.clear_graph()
 
         # --------------------------------------------------
-        # Create Section nodes
+        # Bot 3 — LLM extraction (no database work)
         # --------------------------------------------------
 
-        log_print("Creating Section nodes")
-        for s in sections:
-            neo4j.create_section(
-                section_id=s["section_id"],
-                title=s.get("title", ""),
-                level=s.get("level", 1),
-                parent_id=s.get("parent_id"),
-                doc_id=doc_id,
-                page_start=s.get("page_start"),
-                page_end=s.get("page_end"),
-            )
+        log_print(f"Running Bot 3 — Entity & Relationship Extraction ({workers} workers)")
+        # Up to `workers` LLM calls in flight; nothing is written yet.
+        # Cached extractions are replayed; fresh ones are always recorded
+        extractions = extract_sections(
+            sections_with_text,
+            concurrency=workers,
+            read_cache=use_cache,
+            write_cache=True,
+        )
 
         # --------------------------------------------------
-        # Bot 3 — Entity & relationship extraction
+        # Bots 4 + 6 — ONE regex pass per section (no database work)
         # --------------------------------------------------
 
-        log_print("Running Bot 3 — Entity & Relationship Extraction")
-        for section_id, text in section_text_map.items():
-            process_section_text(
-                section_text=text,
+        log_print("Running Bot 4 — Reference Extraction + Bot 6 — Time Period Extraction")
+
+        references, tables, figures = [], [], []
+        periods, period_links = {}, []
+        for section in sections_with_text:
+            section_id, text = section["section_id"], section["text"]
+
+            scan = scan_section(
+                text=text,
                 section_id=section_id,
-                neo4j=neo4j,
                 doc_id=doc_id,
             )
+            references.extend(scan["references"])
+            tables.extend(scan["tables"])
+            figures.extend(scan["figures"])
+
+            collect_timeperiods(section_id, text, periods, period_links)
 
         # --------------------------------------------------
-        # Bot 4 — Reference / Table / Figure extraction
+        # Write phase — ONE explicit transaction, ONE commit:
+        # Sections, Bot 3 graph, Bot 4 nodes, Bot 6 periods
         # --------------------------------------------------
 
-        log_print("Running Bot 4 — Reference Extraction")
+        log_print("Writing Sections, entities, references and time periods")
+        with neo4j.session() as session, session.begin_transaction() as tx:
+            neo4j.create_sections_batch(node_rows, doc_id=doc_id, session=tx)
 
-        for section_id, text in section_text_map.items():
-            refs = extract_cross_section_references(
-                text=text,
-                section_id=section_id,
-                doc_id=doc_id,
-            )
+            persist_extractions(sections_with_text, extractions, neo4j, doc_id, session=tx)
 
-            tables, figures = extract_tables_and_figures(
-                text=text,
-                section_id=section_id,
-                doc_id=doc_id,
-            )
+            neo4j.create_references_batch(references, doc_id=doc_id, session=tx)
+            neo4j.create_tables_batch(tables, doc_id=doc_id, session=tx)
+            neo4j.create_figures_batch(figures, doc_id=doc_id, session=tx)
+
+            # Bot 6 — Periods + APPLIES_TO links: two UNWINDs for all sections
+            write_timeperiods(neo4j, periods, period_links, doc_id, session=tx)
 
-            for r in refs:
-                neo4j.create_reference(
-                    from_section_id=r["from_section_id"],
-                    target_locator=r["target_locator"],
-                    reference_type=r["reference_type"],
-                    reason=r["reason"],
-                    doc_id=doc_id,
-                )
-
-            for t in tables:
-                neo4j.create_table(
-                    table_id=t["table_id"],
-                    caption="",
-                    page=None,
-                    section_id=section_id,
-                    doc_id=doc_id,
-                )
-
-            for f in figures:
-                neo4j.create_figure(
-                    figure_id=f["figure_id"],
-                    caption="",
-                    page=None,
-                    section_id=section_id,
-                    doc_id=doc_id,
-                )
+            tx.commit()
 
         # --------------------------------------------------
         # Bot 5 — Financial normalization
+        # (reads committed entities; commits its own bounded batches)
         # --------------------------------------------------
 
         log_print("Running Bot 5 — Financial Normalization")
         normalize_financial_entities(neo4j, doc_id)
 
-        # --------------------------------------------------
-        # Bot 6 — Time period extraction
-        # --------------------------------------------------
-
-        log_print("Running Bot 6 — Time Period Extraction")
-
-        sections_with_text = [
-            {
-                "section_id": sid,
-                "text": text,
-            }
-            for sid, text in section_text_map.items()
-        ]
-
-        # Extract time periods from all section texts
-        all_text = " ".join(section_text_map.values())
-        time_periods = extract_timeperiods(all_text)
-        
-        # Store time periods in Neo4j
-        for period in time_periods:
-            neo4j.create_time_period(
-                period_id=period.get("period_id"),
-                period_type=period.get("period_type"),
-                start_date=period.get("start_date"),
-                end_date=period.get("end_date"),
-                doc_id=doc_id
-            )
-
         # --------------------------------------------------
         # Bot 8 — Financial facts
+        # (auto-commit CALL IN TRANSACTIONS: cannot join the tx above)
         # --------------------------------------------------
 
         log_print("Running Bot 8 — Financial Fact Extraction")
@@ -249,6 +286,8 @@ def main():
     parser = argparse.ArgumentParser("GraphRAG V4 Test Runner")
     parser.add_argument("--json", required=True, help="Parsed JSON file")
     parser.add_argument("--clear", action="store_true", help="Clear graph before run")
+    parser.add_argument("--workers", type=int, default=LLM_MAX_CONCURRENCY, help="Concurrent LLM extraction calls (Bot 3)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached Bot 3 extractions (still records new ones)")
 
     args = parser.parse_args()
 
@@ -256,8 +295,13 @@ def main():
         log_file.write("\n" + "=" * 80 + "\n")
         log_file.write(f"RUN STARTED: {datetime.now()}\n")
 
-        with redirect_stdout(log_file), redirect_stderr(log_file):
-            doc_id = run_pipeline_from_json(args.json, args.clear)
+        with redirect_output_fds(log_file):
+            doc_id = run_pipeline_from_json(
+                args.json,
+                args.clear,
+                use_cache=not args.no_cache,
+                workers=args.workers,
+            )
             interactive_query_loop(doc_id)
 
         log_file.write(f"\nRUN ENDED: {datetime.now()}\n")
@@ -3,23 +3,54 @@ Checkpoint Manager for GraphRAG Pipeline
 ----------------------------------------
 Stores progress after each bot so pipeline
 can resume safely after failure.
+
+- Every update is ONE appended line in <doc_id>.log (journal);
+  nothing is re-serialized per update
+- save() / close() compact journal + snapshot into <doc_id>.json
+  (fsync'd temp file + os.replace + directory fsync), then truncate
+  the journal
+- On startup the snapshot is loaded and the journal replayed, so a
+  process crash loses at most a torn final journal line (journal
+  appends are not fsync'd, so a power loss can drop recent ones)
 """
 
-import json
+import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+import orjson
+
 CHECKPOINT_DIR = Path("outputs/checkpoints")
 CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
 
+JOURNAL_BUFFER = 64 * 1024
+
+# Artifacts may carry int-keyed dicts (e.g. page numbers)
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _fsync_dir(path: Path):
+    # Persist the rename itself; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class CheckpointManager:
     def __init__(self, doc_id: str):
         self.doc_id = doc_id
         self.path = CHECKPOINT_DIR / f"{doc_id}.json"
+        self.log_path = CHECKPOINT_DIR / f"{doc_id}.log"
 
         if self.path.exists():
-            self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.data = orjson.loads(self.path.read_bytes())
         else:
             self.data = {
                 "doc_id": doc_id,
@@ -27,23 +58,87 @@ class CheckpointManager:
                 "artifacts": {},
             }
 
+        # O(1) membership mirror; the list stays the on-disk form
+        self._completed = set(self.data["completed_steps"])
+
+        self._replay()
+        self.log = open(self.log_path, "ab", buffering=JOURNAL_BUFFER)
+
+    # --------------------------------------------------
+    # Journal
+    # --------------------------------------------------
+
+    def _replay(self):
+        if not self.log_path.exists():
+            return
+
+        good = 0
+        with open(self.log_path, "r+b") as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Torn write from a crash: cut it so new appends
+                    # start on a clean line
+                    f.truncate(good)
+                    break
+                good += len(line)
+
+                if entry["op"] == "store":
+                    self.data["artifacts"][entry["k"]] = entry["v"]
+                elif entry["k"] not in self._completed:
+                    self._completed.add(entry["k"])
+                    self.data["completed_steps"].append(entry["k"])
+
+    def _append(self, op: str, key: str, value: Any = None):
+        self.log.write(
+            orjson.dumps({"op": op, "k": key, "v": value}, option=DUMPS_OPTIONS) + b"\n"
+        )
+        self.log.flush()  # hand to the OS; no fsync per op
+
     # --------------------------------------------------
     # Core
     # --------------------------------------------------
 
     def save(self):
-        self.path.write_text(
-            json.dumps(self.data, indent=2),
-            encoding="utf-8"
-        )
+        """
+        Compact: snapshot everything, then drop the journal.
+        """
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(self.data, option=DUMPS_OPTIONS))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+
+        # Snapshot contents and rename are on disk; only now is it safe
+        # to drop the journal (replayed entries would be no-ops anyway)
+        self.log.truncate(0)
+
+    def flush(self):
+        self.log.flush()
+
+    def close(self):
+        if self.log.closed:
+            return
+        self.save()
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def mark_completed(self, step: str):
-        if step not in self.data["completed_steps"]:
+        if step not in self._completed:
+            self._completed.add(step)
             self.data["completed_steps"].append(step)
-            self.save()
+            self._append("done", step)
 
     def is_completed(self, step: str) -> bool:
-        return step in self.data["completed_steps"]
+        return step in self._completed
 
     # --------------------------------------------------
     # Artifact storage
@@ -51,7 +146,7 @@ class CheckpointManager:
 
     def store(self, key: str, value: Any):
         self.data["artifacts"][key] = value
-        self.save()
+        self._append("store", key, value)
 
     def load(self, key: str) -> Optional[Any]:
         return self.data["artifacts"].get(key)
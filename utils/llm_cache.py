@@ -0,0 +1,48 @@
+"""
+On-Disk LLM Response Cache
+--------------------------
+Content-addressed: the key is a SHA-256 over every input that shapes
+the response (model, prompt, section text, ...), so a re-run with
+unchanged inputs is a file lookup instead of an LLM call.
+
+- One JSON file per key: outputs/llm_cache/<sha256>.json
+- Each key part is 8-byte length-prefixed before hashing, so
+  ("ab", "c") and ("a", "bc") can never collide
+- Writes are atomic (temp file + rename); a crash never leaves a
+  half-written entry behind
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+
+CACHE_DIR = Path("outputs/llm_cache")
+
+
+def cache_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def load(key: str) -> Optional[Any]:
+    path = CACHE_DIR / f"{key}.json"
+    try:
+        return orjson.loads(path.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+
+def store(key: str, value: Any) -> None:
+    path = CACHE_DIR / f"{key}.json"
+    # Created on first write, not at import (importers may run anywhere)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(orjson.dumps(value))
+    os.replace(tmp, path)
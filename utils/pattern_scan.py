@@ -0,0 +1,91 @@
+"""
+Multi-Pattern Scanner (optional Hyperscan backend)
+--------------------------------------------------
+Matches MANY regexes against a text in ONE SIMD/DFA pass when
+`hyperscan` is installed. Callers keep their own `re` path as fallback.
+
+- Hyperscan only locates candidate match STARTS
+- Each candidate is re-matched with Python `re` at that start,
+  so groups / greedy spans are identical to `re.finditer`
+- Only pure-ASCII text goes through Hyperscan (byte offsets ==
+  str offsets). Anything else uses the per-pattern `re.finditer`
+  loop: Unicode \s / \d (e.g. NBSP in "Figure\xa03") would never
+  be reported as a candidate by a byte scan
+"""
+
+import re
+from typing import List, Iterator, Tuple, Optional
+
+try:
+    import hyperscan
+except ImportError:  # optional dependency
+    hyperscan = None
+
+
+HYPERSCAN_AVAILABLE = hyperscan is not None
+
+
+def compile_hyperscan(patterns: List[str], caseless: bool = True) -> Optional[object]:
+    """
+    Compile patterns into one Hyperscan database.
+    Returns None when Hyperscan is unavailable or rejects a pattern.
+    """
+    if not HYPERSCAN_AVAILABLE:
+        return None
+
+    flags = hyperscan.HS_FLAG_SOM_LEFTMOST
+    if caseless:
+        flags |= hyperscan.HS_FLAG_CASELESS
+
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[p.encode("ascii") for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[flags] * len(patterns),
+        )
+    except Exception as e:
+        print(f"[pattern_scan] Hyperscan compile failed, using re: {e}")
+        return None
+
+    return db
+
+
+def hyperscan_finditer(
+    db,
+    regexes: List[re.Pattern],
+    text: str,
+) -> Iterator[Tuple[int, re.Match]]:
+    """
+    Equivalent of:
+        for i, rx in enumerate(regexes):
+            for m in rx.finditer(text):
+                yield i, m
+    driven by a single Hyperscan pass (ASCII text only).
+    """
+    if not text.isascii():
+        for i, rx in enumerate(regexes):
+            for m in rx.finditer(text):
+                yield i, m
+        return
+
+    starts = set()
+
+    def on_match(pattern_id, start, end, flags, context):
+        starts.add((pattern_id, start))
+
+    db.scan(text.encode("ascii"), match_event_handler=on_match)
+
+    last_end = {}
+    for pattern_id, start in sorted(starts):
+        # finditer never returns overlapping matches of one pattern
+        if start < last_end.get(pattern_id, 0):
+            continue
+
+        m = regexes[pattern_id].match(text, start)
+        if m is None:
+            continue
+
+        last_end[pattern_id] = max(m.end(), m.start() + 1)
+        yield pattern_id, m
@@ -0,0 +1,97 @@
+"""
+Indexed Section Table
+---------------------
+Random access to one section of a large parsed-document JSON without
+re-parsing the document on every probe run.
+
+- First read streams document_structure.sections with ijson ONCE and
+  writes every section as compact orjson bytes into a sidecar table:
+  outputs/section_index/<stem>.sections.bin
+- <stem>.index.pkl maps section_id -> (start, end) byte span in the
+  table, plus the source file's mtime / size
+- Later reads mmap the table and orjson.loads ONE slice
+- The index is rebuilt whenever the source file's mtime or size changes
+"""
+
+import mmap
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict
+
+import ijson
+import orjson
+
+INDEX_DIR = Path("outputs/section_index")
+
+SECTIONS_PREFIX = "document_structure.sections.item"
+
+
+def _paths(json_path: str):
+    stem = Path(json_path).stem
+    return INDEX_DIR / f"{stem}.sections.bin", INDEX_DIR / f"{stem}.index.pkl"
+
+
+def build_index(json_path: str) -> Dict[str, Any]:
+    table_path, index_path = _paths(json_path)
+    stat = os.stat(json_path)
+
+    offsets = {}
+    pos = 0
+    # Created on first build, not at import
+    table_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_table = table_path.with_suffix(".tmp")
+
+    with open(json_path, "rb") as f, open(tmp_table, "wb") as out:
+        for section in ijson.items(f, SECTIONS_PREFIX, use_float=True):
+            blob = orjson.dumps(section)
+            out.write(blob)
+            # First occurrence wins, same as a linear scan
+            offsets.setdefault(section["section_id"], (pos, pos + len(blob)))
+            pos += len(blob)
+
+    index = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "offsets": offsets,
+    }
+
+    # Table first, index last: a valid index always has its table
+    os.replace(tmp_table, table_path)
+    tmp_index = index_path.with_suffix(".tmp")
+    tmp_index.write_bytes(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp_index, index_path)
+
+    return index
+
+
+def load_index(json_path: str) -> Dict[str, Any]:
+    table_path, index_path = _paths(json_path)
+    stat = os.stat(json_path)
+
+    try:
+        index = pickle.loads(index_path.read_bytes())
+    except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+        return build_index(json_path)
+
+    if (
+        index.get("mtime_ns") != stat.st_mtime_ns
+        or index.get("size") != stat.st_size
+        or not table_path.exists()
+    ):
+        return build_index(json_path)
+
+    return index
+
+
+def load_section(json_path: str, section_id: str) -> dict:
+    span = load_index(json_path)["offsets"].get(section_id)
+    if span is None:
+        raise ValueError(f"Section {section_id} not found")
+
+    start, end = span
+    table_path, _ = _paths(json_path)
+
+    with open(table_path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return orjson.loads(mm[start:end])